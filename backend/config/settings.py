@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -63,6 +64,10 @@ DATABASES = {
         'PASSWORD': 'postgres',
         'HOST': 'db',
         'PORT': '5432',
+        'OPTIONS': {
+            # Looser than the 0.6 default so typeahead tolerates misspelt place names
+            'options': '-c pg_trgm.word_similarity_threshold=0.45',
+        },
     }
 }
 
@@ -93,8 +98,28 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Processes resizing uploaded images (core.images); 0 processes them inline
+IMAGE_PROCESSING_WORKERS = 2
+
+# Seconds between flushes of buffered property views (core.view_tracking), and
+# the number of waiting views that triggers an early flush; 0 writes each view inline
+VIEW_FLUSH_INTERVAL = 10
+VIEW_FLUSH_BATCH = 1000
+
+# Reload the location dropdown index (core.location_index) on a background thread
+# after locations change, serving the previous one meanwhile; False reloads inline
+LOCATION_INDEX_BACKGROUND_RELOAD = True
+
 AUTH_USER_MODEL = 'core.User'
 
+# Per-process cache; point this at Redis or Memcached when running several workers
+# so search-cache invalidation reaches every process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
@@ -105,6 +130,12 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    # First entry is the default; MessagePack is chosen with Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.gis.admin import OSMGeoAdmin
-from .models import User, Property, PropertyImage, Shortlist, PropertyView, IndiaLocation
+from .models import User, Property, PropertyImage, Shortlist, PropertyView, PropertyViewDaily, IndiaLocation
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -28,6 +28,12 @@ class PropertyViewAdmin(admin.ModelAdmin):
     list_display = ('property', 'user', 'created_at')
     search_fields = ('property__title', 'user__username')
 
+@admin.register(PropertyViewDaily)
+class PropertyViewDailyAdmin(admin.ModelAdmin):
+    list_display = ('property', 'date', 'views')
+    list_filter = ('date',)
+    search_fields = ('property__title',)
+
 @admin.register(IndiaLocation)
 class IndiaLocationAdmin(OSMGeoAdmin):
     list_display = ('state', 'district', 'sub_district', 'village', 'pin_code')
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals
+        pre_migrate.connect(signals.create_postgres_extensions, sender=self)
@@ -0,0 +1,52 @@
+"""
+Conditional GET support for viewset handlers. The ETag is computed from
+timestamps and version stamps before the handler runs, so a 304 skips both
+the serializer and the queries behind it.
+
+Only entity tags are used: shortlist counts and location names change
+without touching Property.updated_at, so a Last-Modified date would answer
+If-Modified-Since with stale 304s.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+
+def make_etag(request, *parts):
+    # The negotiated media type is part of the representation (JSON vs MessagePack)
+    parts = parts + (request.accepted_media_type,)
+    return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest())
+
+
+def conditional_view(etag_method):
+    """
+    Answer If-None-Match for a viewset handler. `etag_method` names a view
+    method taking the handler's arguments and returning the ETag, or None
+    to run the handler unconditionally.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapped(self, request, *args, **kwargs):
+            etag = getattr(self, etag_method)(request, *args, **kwargs)
+            if etag is None:
+                return handler(self, request, *args, **kwargs)
+
+            not_modified = get_conditional_response(request._request, etag=etag)
+            if not_modified is not None:
+                set_etag(not_modified, etag)
+                return not_modified
+
+            response = handler(self, request, *args, **kwargs)
+            if 200 <= response.status_code < 300:
+                set_etag(response, etag)
+            return response
+        return wrapped
+    return decorator
+
+
+def set_etag(response, etag):
+    response['ETag'] = etag
+    # Let clients keep the body but revalidate it on every use
+    patch_cache_control(response, private=True, no_cache=True)
@@ -0,0 +1,95 @@
+"""
+Streaming exports of property search results as CSV, NDJSON or GeoJSON.
+
+Rows come from a projected `.values()` queryset read with `.iterator()`,
+which on PostgreSQL is a server-side cursor fetched in chunks, and are
+encoded one at a time into a generator for StreamingHttpResponse. Memory
+use is the same for ten rows or ten million, and the first bytes go out as
+soon as the first chunk has been fetched.
+"""
+import csv
+import json
+
+from django.utils.encoding import filepath_to_uri
+
+from .renderers import encode_default, orjson
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'geojson': ('application/geo+json', 'geojson'),
+}
+# Default columns; `fields=` picks others from projections.PROJECTION_FIELDS
+EXPORT_FIELDS = (
+    'id', 'property_type', 'title', 'price', 'area', 'address', 'village', 'sub_district',
+    'district', 'state', 'pin_code', 'latitude', 'longitude', 'shortlisted_count', 'created_at', 'updated_at',
+)
+CHUNK_SIZE = 2000
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value, default=encode_default, option=orjson.OPT_UTC_Z).decode('utf-8')
+    return json.dumps(value, default=encode_default, ensure_ascii=False)
+
+
+class Echo:
+    """File-like object handing back whatever csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_items(rows, fields, media_prefix):
+    """Projected rows as dicts keyed by field name, image paths made absolute"""
+    keys = [(name, f'p_{name}') for name in fields]
+    has_image = 'primary_image' in fields
+    for row in rows:
+        item = {name: row[key] for name, key in keys}
+        if has_image and item['primary_image']:
+            item['primary_image'] = media_prefix + filepath_to_uri(item['primary_image'])
+        yield item
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (str, int, float)):
+        return value
+    return encode_default(value)
+
+
+def stream_csv(rows, fields, media_prefix):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for item in iter_items(rows, fields, media_prefix):
+        yield writer.writerow([csv_value(value) for value in item.values()])
+
+
+def stream_ndjson(rows, fields, media_prefix):
+    for item in iter_items(rows, fields, media_prefix):
+        yield dumps(item) + '\n'
+
+
+def stream_geojson(rows, fields, media_prefix):
+    """A FeatureCollection with a Point per property; `latitude`/`longitude` become the geometry"""
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for item in iter_items(rows, fields, media_prefix):
+        longitude, latitude = item.pop('longitude', None), item.pop('latitude', None)
+        geometry = None if longitude is None else {'type': 'Point', 'coordinates': [longitude, latitude]}
+        yield separator + dumps({'type': 'Feature', 'id': item.get('id'), 'geometry': geometry, 'properties': item})
+        separator = ','
+    yield ']}'
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'geojson': stream_geojson,
+}
+
+
+def stream(rows, fields, export_format, media_prefix=''):
+    """Generator of encoded text for a projected queryset (see projections.project_properties)"""
+    return STREAMERS[export_format](rows.iterator(chunk_size=CHUNK_SIZE), fields, media_prefix)
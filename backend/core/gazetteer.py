@@ -0,0 +1,116 @@
+"""
+Published snapshots of the IndiaLocation hierarchy.
+
+`publish_gazetteer` writes the whole hierarchy and one file per state as
+gzip-compressed JSON named by the hash of their content, plus a small
+manifest pointing at the current files. Clients read the manifest, fetch
+the snapshot once (it never changes under its name, so it is served with
+far-future cache headers) and run the cascading dropdowns locally.
+
+The manifest is replaced in place, so it is never missing while a publish
+runs. Snapshots of the last KEEP_PUBLISHED publishes stay available to
+clients still holding an older manifest; earlier ones are deleted.
+
+Snapshot format, keys sorted:
+    {"states": {state: {district: {sub_district: {village: pin_code}}}}}
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.text import slugify
+
+from .models import IndiaLocation
+
+SNAPSHOT_DIR = 'gazetteer'
+MANIFEST_NAME = f'{SNAPSHOT_DIR}/manifest.json'
+# Snapshot names of recent publishes, newest first; not served to clients
+HISTORY_NAME = f'{SNAPSHOT_DIR}/history.json'
+KEEP_PUBLISHED = 3
+
+
+def build_hierarchy():
+    states = {}
+    rows = IndiaLocation.objects.order_by().values_list(
+        'state', 'district', 'sub_district', 'village', 'pin_code'
+    )
+    for state, district, sub_district, village, pin_code in rows.iterator():
+        states.setdefault(state, {}).setdefault(district, {}).setdefault(sub_district, {})[village] = pin_code
+    return states
+
+
+def encode_snapshot(states):
+    """(content hash, gzip bytes) of a snapshot; equal data always gives equal bytes"""
+    raw = json.dumps({'states': states}, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    # mtime=0 keeps the compressed bytes reproducible too
+    return digest, gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def save_snapshot(prefix, states):
+    digest, compressed = encode_snapshot(states)
+    name = f'{prefix}-{digest}.json.gz'
+    path = f'{SNAPSHOT_DIR}/{name}'
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(compressed))
+    return {'name': name, 'hash': digest, 'size': len(compressed)}
+
+
+def publish():
+    """Write the snapshots and the manifest, then prune old snapshots; returns the manifest"""
+    states = build_hierarchy()
+    manifest = {
+        'all': save_snapshot('india', states),
+        'states': {state: save_snapshot(slugify(state), {state: states[state]}) for state in sorted(states)},
+    }
+    # Point the manifest at the new files only once they all exist
+    replace(MANIFEST_NAME, json.dumps(manifest, sort_keys=True).encode('utf-8'))
+    prune([manifest['all']['name']] + [snapshot['name'] for snapshot in manifest['states'].values()])
+    return manifest
+
+
+def replace(name, content):
+    """Overwrite a stored file; on local disk readers see the old or the new one, never neither"""
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        # Remote storage without local paths: fall back to delete and save
+        default_storage.delete(name)
+        default_storage.save(name, ContentFile(content))
+        return
+    temporary = default_storage.save(f'{name}.tmp', ContentFile(content))
+    os.replace(default_storage.path(temporary), path)
+
+
+def prune(names):
+    """Record this publish's snapshot names and delete snapshots no recent publish refers to"""
+    history = [names]
+    if default_storage.exists(HISTORY_NAME):
+        with default_storage.open(HISTORY_NAME) as stored:
+            history += json.loads(stored.read())
+    history = history[:KEEP_PUBLISHED]
+    replace(HISTORY_NAME, json.dumps(history).encode('utf-8'))
+
+    keep = {name for published in history for name in published}
+    for name in default_storage.listdir(SNAPSHOT_DIR)[1]:
+        if name.endswith('.json.gz') and name not in keep:
+            default_storage.delete(f'{SNAPSHOT_DIR}/{name}')
+
+
+def load_manifest():
+    if not default_storage.exists(MANIFEST_NAME):
+        return None
+    with default_storage.open(MANIFEST_NAME) as manifest:
+        return json.loads(manifest.read())
+
+
+def open_snapshot(name):
+    """The stored gzip bytes of a snapshot, or None for an unknown name"""
+    path = f'{SNAPSHOT_DIR}/{name}'
+    if '/' in name or not name.endswith('.json.gz') or not default_storage.exists(path):
+        return None
+    with default_storage.open(path) as snapshot:
+        return snapshot.read()
@@ -0,0 +1,127 @@
+import math
+
+from django.db.models import BooleanField, FloatField, Func, Value
+
+KM_PER_DEGREE_LAT = 111.32
+# Coordinates further than this from every known location centroid are not
+# resolved to a location automatically
+REVERSE_GEOCODE_MAX_KM = 25
+# Default and upper bound of a property search's max_distance
+MAX_SEARCH_DISTANCE_KM = 500
+
+
+class KNNDistance(Func):
+    """
+    `column <-> point`, the PostGIS KNN operator. Ordering by it lets the
+    planner walk the GiST index on a geography column in distance order
+    instead of measuring and sorting every matching row.
+    """
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        super().__init__(expression, Value(point.x), Value(point.y), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (column, column_params), (x, x_params), (y, y_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        sql = f'{column} <-> ST_SetSRID(ST_MakePoint({x}, {y}), 4326)::geography'
+        return sql, (*column_params, *x_params, *y_params)
+
+
+class AsMVTGeom(Func):
+    """
+    A geography point projected into the integer coordinate space of map tile
+    z/x/y, ready to be aggregated with ST_AsMVT.
+    """
+
+    def __init__(self, expression, z, x, y, **extra):
+        super().__init__(expression, Value(z), Value(x), Value(y), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (column, column_params), (z, z_params), (x, x_params), (y, y_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        sql = f'ST_AsMVTGeom(ST_Transform({column}::geometry, 3857), ST_TileEnvelope({z}, {x}, {y}))'
+        return sql, (*column_params, *z_params, *x_params, *y_params)
+
+
+class AsGeometry(Func):
+    """
+    A geography column as planar lon/lat geometry. The property_geometry
+    GiST index is built on this exact expression.
+    """
+    template = '(%(expressions)s::geometry)'
+
+
+class InEnvelope(Func):
+    """
+    `geometry && ST_MakeEnvelope(...)`: the geometry's bounding box overlaps
+    the lon/lat rectangle. Map viewports and tiles must be compared in
+    geometry; a geography box takes its edges as great circles, so a world
+    view from -180 to 180 collapses to a single meridian.
+    """
+    output_field = BooleanField()
+
+    def __init__(self, expression, bbox, **extra):
+        super().__init__(expression, *(Value(float(value)) for value in bbox), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (column, column_params), *bounds = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        sql = f"{column} && ST_MakeEnvelope({', '.join(bound for bound, _ in bounds)}, 4326)"
+        return sql, (*column_params, *(param for _, params in bounds for param in params))
+
+
+class Longitude(Func):
+    """ST_X of a geography point column"""
+    template = 'ST_X(%(expressions)s::geometry)'
+    output_field = FloatField()
+
+
+class Latitude(Func):
+    """ST_Y of a geography point column"""
+    template = 'ST_Y(%(expressions)s::geometry)'
+    output_field = FloatField()
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lng, min_lat, max_lng, max_lat) of a box that fully contains the
+    circle of `radius_km` around the point.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(longitude - lng_delta, -180.0),
+        max(latitude - lat_delta, -90.0),
+        min(longitude + lng_delta, 180.0),
+        min(latitude + lat_delta, 90.0),
+    )
+
+
+def tile_bounds(z, x, y):
+    """(min_lng, min_lat, max_lng, max_lat) of web-mercator tile z/x/y"""
+    tiles = 2 ** z
+
+    def tile_latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / tiles))))
+
+    return (
+        x / tiles * 360.0 - 180.0,
+        tile_latitude(y + 1),
+        (x + 1) / tiles * 360.0 - 180.0,
+        tile_latitude(y),
+    )
+
+
+def parse_bbox(value):
+    """
+    Parse a `min_lng,min_lat,max_lng,max_lat` query parameter; raises
+    ValueError when it is malformed or out of range.
+    """
+    min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError(f"Invalid bbox: {value}")
+    return min_lng, min_lat, max_lng, max_lat
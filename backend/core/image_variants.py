@@ -0,0 +1,61 @@
+"""
+Image encoding done in the worker processes of core.images. Deliberately
+free of Django imports so it loads quickly in a spawned process; it takes
+and returns bytes only.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+# Variant name -> longest edge in pixels
+VARIANT_SIZES = (
+    ('thumb', 320),
+    ('card', 640),
+    ('full', 1600),
+)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+ORIGINAL_JPEG_QUALITY = 95
+
+
+def encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    # No exif= argument, so camera metadata (GPS position included) is dropped
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def render_variants(data):
+    """
+    {
+        'original': (format, bytes),
+        'variants': {name: {'width': w, 'height': h, 'webp': bytes, 'jpeg': bytes}},
+    }
+    for the uploaded image `data`. The original is re-encoded without its
+    metadata; variants are never upscaled.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source_format = source.format
+        # Apply the EXIF orientation before the EXIF block is discarded
+        image = ImageOps.exif_transpose(source)
+        image.load()
+
+    if source_format == 'PNG':
+        original = ('png', encode(image, 'PNG', optimize=True))
+    else:
+        original = ('jpeg', encode(image.convert('RGB'), 'JPEG', quality=ORIGINAL_JPEG_QUALITY))
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = {}
+    for name, size in VARIANT_SIZES:
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+        variants[name] = {
+            'width': variant.width,
+            'height': variant.height,
+            'webp': encode(variant, 'WEBP', quality=WEBP_QUALITY, method=4),
+            'jpeg': encode(variant.convert('RGB'), 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True),
+        }
+    return {'original': original, 'variants': variants}
@@ -0,0 +1,151 @@
+"""
+Background processing of uploaded property images.
+
+Requests only store the original upload. After the transaction commits,
+each image is handed to a dispatcher thread, which reads it from storage
+and has a process pool (core.image_variants, outside the GIL) strip its
+metadata and render the thumb/card/full variants as WebP and JPEG. The
+results are written back to storage and recorded in PropertyImage.variants.
+
+An image whose processing fails is marked FAILED, which hides it from
+property responses (its original still carries EXIF, GPS included) until
+`manage.py process_images` retries it. One Pillow cannot decode at all is
+deleted.
+
+IMAGE_PROCESSING_WORKERS = 0 processes inline instead, for tests and
+single-process development servers.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from PIL import Image, UnidentifiedImageError
+
+from . import image_variants
+from .signals import touch_property
+
+_lock = threading.Lock()
+_process_pool = None
+_dispatcher = None
+
+
+def get_worker_count():
+    return getattr(settings, 'IMAGE_PROCESSING_WORKERS', min(2, os.cpu_count() or 1))
+
+
+def get_pools():
+    global _process_pool, _dispatcher
+    with _lock:
+        if _process_pool is None:
+            workers = get_worker_count()
+            # spawn, not fork: forking a threaded server process is unsafe
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _dispatcher = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-dispatch')
+        return _process_pool, _dispatcher
+
+
+def schedule(image_ids):
+    """Process these PropertyImage rows once the current transaction commits"""
+    image_ids = list(image_ids)
+    if image_ids:
+        transaction.on_commit(lambda: dispatch(image_ids))
+
+
+def dispatch(image_ids):
+    if get_worker_count() == 0:
+        for pk in image_ids:
+            process_or_mark_failed(pk, render=image_variants.render_variants)
+        return
+    process_pool, dispatcher = get_pools()
+    for pk in image_ids:
+        dispatcher.submit(process_in_background, pk, process_pool)
+
+
+def process_in_background(pk, process_pool):
+    close_old_connections()
+    try:
+        process_or_mark_failed(
+            pk, render=lambda data: process_pool.submit(image_variants.render_variants, data).result()
+        )
+    finally:
+        # Dispatcher threads outlive requests; do not leave their connections open
+        connection.close()
+
+
+def process_or_mark_failed(pk, render):
+    try:
+        process_image(pk, render)
+    except Exception as e:
+        print(f"Image processing failed for PropertyImage {pk}: {e}")
+        try:
+            mark_failed(pk)
+        except Exception as e:
+            print(f"Could not mark PropertyImage {pk} as failed: {e}")
+
+
+def mark_failed(pk):
+    from .models import PropertyImage
+
+    property_id = PropertyImage.objects.filter(pk=pk).values_list('property_id', flat=True).first()
+    if property_id is not None:
+        PropertyImage.objects.filter(pk=pk).update(status=PropertyImage.FAILED)
+        # The image drops out of the property's responses
+        touch_property(property_id)
+
+
+def process_image(pk, render):
+    """
+    Re-encode one image and render its variants. Raises when processing
+    fails for a reason that may pass (storage, worker or database errors);
+    an image that cannot be decoded is deleted.
+    """
+    from .models import PropertyImage
+
+    image = PropertyImage.objects.filter(pk=pk).first()
+    if image is None or not image.image:
+        return
+    storage = image.image.storage
+    with storage.open(image.image.name) as original:
+        data = original.read()
+    try:
+        result = render(data)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError) as e:
+        print(f"Deleting PropertyImage {pk}, which cannot be decoded: {e}")
+        image.delete()
+        storage.delete(image.image.name)
+        return
+
+    base, _ = os.path.splitext(image.image.name)
+    original_format, original_data = result['original']
+    original_name = storage.save(f'{base}.{original_format}', ContentFile(original_data))
+    if original_name != image.image.name:
+        storage.delete(image.image.name)
+
+    variants = {}
+    for name, variant in result['variants'].items():
+        variants[name] = {
+            'width': variant['width'],
+            'height': variant['height'],
+            'webp': storage.save(f'{base}_{name}.webp', ContentFile(variant['webp'])),
+            'jpeg': storage.save(f'{base}_{name}.jpg', ContentFile(variant['jpeg'])),
+        }
+    PropertyImage.objects.filter(pk=pk).update(image=original_name, variants=variants, status=PropertyImage.READY)
+    touch_property(image.property_id)
+
+
+def variant_urls(image, build_url):
+    """{'webp': srcset, 'jpeg': srcset} for a processed image, else None"""
+    if not image.variants:
+        return None
+    storage = image.image.storage
+    ordered = sorted(image.variants.values(), key=lambda variant: variant['width'])
+    return {
+        image_format: ', '.join(
+            f"{build_url(storage.url(variant[image_format]))} {variant['width']}w" for variant in ordered
+        )
+        for image_format in ('webp', 'jpeg')
+    }
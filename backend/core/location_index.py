@@ -0,0 +1,112 @@
+"""
+In-process index of the IndiaLocation hierarchy (state -> district ->
+sub_district -> village -> pin codes) for the location dropdowns.
+
+Loaded once per worker and reloaded when the location version stamp
+(bumped by the IndiaLocation signals) moves, so a lookup costs one cache
+read instead of a SELECT DISTINCT. The reload runs on a background thread
+while requests keep reading the previous index; only the first load
+blocks. LOCATION_INDEX_BACKGROUND_RELOAD = False reloads inline instead,
+for tests.
+"""
+import sys
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .versioning import LOCATION_VERSION_KEY, get_version
+
+EMPTY = ()
+FIELDS = ('state', 'district', 'sub_district', 'village')
+
+
+def reloads_in_background():
+    return getattr(settings, 'LOCATION_INDEX_BACKGROUND_RELOAD', True)
+
+
+class LocationIndex:
+    """
+    Sorted tuples of interned names keyed by their parent path, and pin
+    codes keyed by every path above the village, so filtering by state,
+    state+district or state+district+sub_district is a dict lookup.
+    Village-level and other filter combinations are answered by the
+    database: an index over each village's pin codes would cost far more
+    memory than those rarer lookups save.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._reloading = False
+        self._children = {}
+        self._pin_codes = {}
+
+    def refresh(self):
+        """Reload from the database if the location version has moved"""
+        version = get_version(LOCATION_VERSION_KEY)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version or self._reloading:
+                return
+            if self._version is not None and reloads_in_background():
+                self._reloading = True
+                threading.Thread(
+                    target=self._reload_in_background, args=(version,), name='location-index', daemon=True
+                ).start()
+                return
+            self._load(version)
+
+    def _reload_in_background(self, version):
+        try:
+            self._load(version)
+        except Exception as e:
+            # Keep serving the old index; the next request tries again
+            print(f"Reloading the location index failed: {e}")
+        finally:
+            self._reloading = False
+            connection.close()
+
+    def _load(self, version):
+        from .models import IndiaLocation
+
+        intern = sys.intern
+        children, pin_codes = {}, {}
+        locations = IndiaLocation.objects.order_by().values_list(*FIELDS, 'pin_code')
+        for row in locations.iterator():
+            path = tuple(intern(value) for value in row[:4])
+            for depth in range(4):
+                children.setdefault(path[:depth], set()).add(path[depth])
+                pin_codes.setdefault(path[:depth], set()).add(row[4])
+
+        # Swap in the finished index; readers never see a half-built one
+        self._children, self._pin_codes = (
+            {key: tuple(sorted(values)) for key, values in children.items()},
+            {key: tuple(sorted(values)) for key, values in pin_codes.items()},
+        )
+        self._version = version
+
+    def children(self, *path):
+        """Sorted names one level below `path`, e.g. children('Maharashtra') for its districts"""
+        self.refresh()
+        return self._children.get(path, EMPTY)
+
+    def pin_codes(self, state=None, district=None, sub_district=None, village=None):
+        filters = (state, district, sub_district, village)
+        depth = 0
+        while depth < 3 and filters[depth]:
+            depth += 1
+        if not any(filters[depth:]):
+            self.refresh()
+            return self._pin_codes.get(filters[:depth], EMPTY)
+
+        from .models import IndiaLocation
+
+        matches = IndiaLocation.objects.filter(**{
+            field: value for field, value in zip(FIELDS, filters) if value
+        }).order_by('pin_code').values_list('pin_code', flat=True).distinct()
+        return tuple(matches)
+
+
+location_index = LocationIndex()
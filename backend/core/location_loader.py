@@ -0,0 +1,247 @@
+"""
+Bulk loading of IndiaLocation rows through a PostgreSQL staging table.
+
+Source records are normalized in Python, streamed into a temporary staging
+table with COPY and merged into core_indialocation with set-based
+statements keyed on the (state, district, sub_district, village) unique
+constraint. Signals do not fire for these statements, so callers finish
+with `finish_bulk_change` to refresh everything derived from locations.
+"""
+import csv
+import io
+import re
+
+from django.db import connection
+
+from . import search_cache
+from .models import IndiaLocation, Property
+from .versioning import LOCATION_VERSION_KEY, bump_version
+
+STAGING_TABLE = 'location_staging'
+STAGING_COLUMNS = (
+    'line_no', 'state', 'district', 'sub_district', 'village', 'pin_code', 'longitude', 'latitude', 'census_code',
+)
+
+# Source column names (normalized to snake case) accepted for each field,
+# covering the Census 2011 village directory and the PIN code directory
+FIELD_ALIASES = {
+    'state': ('state', 'state_name', 'statename'),
+    'district': ('district', 'district_name', 'districtname'),
+    'sub_district': ('sub_district', 'subdistrict', 'sub_district_name', 'subdistrict_name', 'taluk', 'tehsil'),
+    'village': ('village', 'village_name', 'villagename', 'locality', 'office_name', 'officename'),
+    'pin_code': ('pin_code', 'pincode', 'pin'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lng', 'lon', 'long'),
+    'census_code': ('census_code', 'village_code', 'census_village_code'),
+}
+
+# Generous bounding box of India, to catch swapped or garbage coordinates
+LATITUDE_RANGE = (6.0, 38.0)
+LONGITUDE_RANGE = (68.0, 98.0)
+
+NAME_MAX_LENGTH = IndiaLocation._meta.get_field('village').max_length
+CENSUS_CODE_MAX_LENGTH = IndiaLocation._meta.get_field('census_code').max_length
+
+
+def header_key(name):
+    return re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+
+
+def field_lookup(record):
+    """Map each IndiaLocation field to the key holding it in this record"""
+    keys = {header_key(key): key for key in record}
+    return {
+        field: next((keys[alias] for alias in aliases if alias in keys), None)
+        for field, aliases in FIELD_ALIASES.items()
+    }
+
+
+def normalize_name(value, title_case=False):
+    name = ' '.join(str(value or '').split())
+    return name.title() if title_case else name
+
+
+def normalize_location(record, lookup, title_case=False, require_coordinates=True):
+    """
+    A staging row (without line number) from one source record; raises
+    ValueError describing the first problem found. Without
+    `require_coordinates`, a record with no coordinates at all stages None.
+    """
+    def get(field):
+        key = lookup[field]
+        return record.get(key) if key is not None else None
+
+    names = []
+    for field in ('state', 'district', 'sub_district', 'village'):
+        name = normalize_name(get(field), title_case)
+        if not name:
+            raise ValueError(f'{field} is missing')
+        if len(name) > NAME_MAX_LENGTH:
+            raise ValueError(f'{field} is longer than {NAME_MAX_LENGTH} characters')
+        names.append(name)
+
+    pin_code = ''.join(str(get('pin_code') or '').split())
+    if not re.fullmatch(r'[1-9][0-9]{5}', pin_code):
+        raise ValueError(f'invalid pin code: {pin_code!r}')
+
+    if not require_coordinates and get('latitude') in (None, '') and get('longitude') in (None, ''):
+        latitude = longitude = None
+    else:
+        latitude, longitude = parse_coordinates(get('latitude'), get('longitude'))
+
+    census_code = str(get('census_code') or '').strip()
+    if len(census_code) > CENSUS_CODE_MAX_LENGTH:
+        raise ValueError(f'census code is longer than {CENSUS_CODE_MAX_LENGTH} characters')
+
+    return (*names, pin_code, longitude, latitude, census_code)
+
+
+def parse_coordinates(latitude, longitude):
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('latitude and longitude must be numbers')
+    if not (LATITUDE_RANGE[0] <= latitude <= LATITUDE_RANGE[1]
+            and LONGITUDE_RANGE[0] <= longitude <= LONGITUDE_RANGE[1]):
+        raise ValueError(f'coordinates outside India: {latitude}, {longitude}')
+    return latitude, longitude
+
+
+def create_staging_table(cursor):
+    # Rows vanish at commit, so each transaction starts from an empty table.
+    # Coordinates may be null for sync sources that do not carry them.
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+            line_no bigint NOT NULL,
+            state varchar(100) NOT NULL,
+            district varchar(100) NOT NULL,
+            sub_district varchar(100) NOT NULL,
+            village varchar(100) NOT NULL,
+            pin_code varchar(6) NOT NULL,
+            longitude double precision,
+            latitude double precision,
+            census_code varchar(15) NOT NULL
+        ) ON COMMIT DELETE ROWS
+    """)
+
+
+def copy_to_staging(cursor, rows):
+    """COPY (line_no, *normalized location) tuples into the staging table"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    # csv.writer leaves empty strings unquoted, which COPY reads as NULL;
+    # a missing census code is staged as '' like the ORM stores it
+    cursor.copy_expert(
+        f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN "
+        "WITH (FORMAT csv, FORCE_NOT_NULL (census_code))", buffer
+    )
+
+
+def merge_staging(cursor):
+    """
+    Upsert the staged rows; the last occurrence of a location wins.
+    Returns (inserted, [(id, state, district) of updated locations]).
+    """
+    table = IndiaLocation._meta.db_table
+    cursor.execute(f"""
+        INSERT INTO {table} AS location
+            (state, district, sub_district, village, pin_code, centroid, census_code)
+        SELECT DISTINCT ON (state, district, sub_district, village)
+            state, district, sub_district, village, pin_code,
+            ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography, census_code
+        FROM {STAGING_TABLE}
+        ORDER BY state, district, sub_district, village, line_no DESC
+        ON CONFLICT (state, district, sub_district, village) DO UPDATE SET
+            pin_code = EXCLUDED.pin_code,
+            centroid = EXCLUDED.centroid,
+            census_code = EXCLUDED.census_code
+        WHERE location.pin_code <> EXCLUDED.pin_code
+            OR location.census_code <> EXCLUDED.census_code
+            OR NOT ST_Equals(location.centroid::geometry, EXCLUDED.centroid::geometry)
+        RETURNING id, state, district, (xmax = 0) AS inserted
+    """)
+    inserted, updated = 0, []
+    for pk, state, district, is_new in cursor.fetchall():
+        if is_new:
+            inserted += 1
+        else:
+            updated.append((pk, state, district))
+    return inserted, updated
+
+
+def sync_staging(cursor, default_centroid):
+    """
+    Make the table match the staged source: insert new locations (at
+    `default_centroid`, a (longitude, latitude) pair, when the source has no
+    coordinates), update changed pin codes and centroids, and list the
+    locations missing from the source without deleting them, since
+    properties may refer to them.
+    Returns (inserted, [(id, state, district) updated], [missing rows]).
+    """
+    table = IndiaLocation._meta.db_table
+    source = f"""
+        SELECT DISTINCT ON (state, district, sub_district, village) *
+        FROM {STAGING_TABLE}
+        ORDER BY state, district, sub_district, village, line_no DESC
+    """
+    key_match = (
+        'location.state = source.state AND location.district = source.district '
+        'AND location.sub_district = source.sub_district AND location.village = source.village'
+    )
+
+    cursor.execute(f"""
+        UPDATE {table} AS location SET
+            pin_code = source.pin_code,
+            centroid = COALESCE(
+                ST_SetSRID(ST_MakePoint(source.longitude, source.latitude), 4326)::geography,
+                location.centroid
+            )
+        FROM ({source}) AS source
+        WHERE {key_match}
+            AND (location.pin_code <> source.pin_code OR (
+                source.longitude IS NOT NULL AND NOT ST_Equals(
+                    location.centroid::geometry,
+                    ST_SetSRID(ST_MakePoint(source.longitude, source.latitude), 4326)
+                )
+            ))
+        RETURNING location.id, location.state, location.district
+    """)
+    updated = cursor.fetchall()
+
+    cursor.execute(f"""
+        INSERT INTO {table} (state, district, sub_district, village, pin_code, centroid, census_code)
+        SELECT source.state, source.district, source.sub_district, source.village, source.pin_code,
+            ST_SetSRID(ST_MakePoint(
+                COALESCE(source.longitude, %s), COALESCE(source.latitude, %s)
+            ), 4326)::geography,
+            source.census_code
+        FROM ({source}) AS source
+        WHERE NOT EXISTS (SELECT 1 FROM {table} AS location WHERE {key_match})
+    """, default_centroid)
+    inserted = cursor.rowcount
+
+    cursor.execute(f"""
+        SELECT location.id, location.state, location.district, location.sub_district, location.village
+        FROM {table} AS location
+        WHERE NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} AS source WHERE {key_match})
+        ORDER BY location.state, location.district, location.sub_district, location.village
+    """)
+    missing = cursor.fetchall()
+    return inserted, updated, missing
+
+
+def refresh_changed_locations(updated):
+    """
+    Re-index the properties of changed locations; call inside the
+    transaction that changed them.
+    """
+    if updated and connection.vendor == 'postgresql':
+        Property.objects.filter(location_id__in=[pk for pk, _, _ in updated]).update_search_vectors()
+
+
+def finish_bulk_change(districts):
+    """Invalidate caches for a committed bulk change touching these (state, district) pairs"""
+    bump_version(LOCATION_VERSION_KEY)
+    for state, district in districts:
+        search_cache.invalidate_location(state, district)
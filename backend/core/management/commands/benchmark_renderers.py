@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.models import Property
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from core.serializers import PropertySerializer
+
+class Command(BaseCommand):
+    help = 'Compare API renderers on a page of PropertySerializer output'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100, help='Properties per page')
+        parser.add_argument('--repeat', type=int, default=200, help='Renders per renderer')
+
+    def handle(self, *args, **options):
+        properties = list(Property.objects.with_details()[:options['count']])
+        if not properties:
+            raise CommandError('No properties in the database to benchmark with')
+
+        request = Request(APIRequestFactory().get('/api/properties/'))
+        data = PropertySerializer(properties, many=True, context={'request': request}).data
+        page = {'next': None, 'results': data}
+
+        renderers = [
+            ('DRF JSONRenderer', JSONRenderer()),
+            ('ORJSONRenderer', ORJSONRenderer()),
+            ('MessagePackRenderer', MessagePackRenderer()),
+        ]
+        self.stdout.write(f'{len(properties)} properties, {options["repeat"]} renders each')
+
+        baseline = None
+        for name, renderer in renderers:
+            body = renderer.render(page, renderer.media_type, {})
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                renderer.render(page, renderer.media_type, {})
+            per_request = (time.perf_counter() - start) / options['repeat'] * 1000
+            baseline = baseline or per_request
+            self.stdout.write(
+                f'{name:<22} {per_request:8.3f} ms/request  {len(body):>9} bytes  '
+                f'{baseline / per_request:5.1f}x'
+            )
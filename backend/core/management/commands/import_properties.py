@@ -0,0 +1,42 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.models import User
+from core.property_import import DEFAULT_CHUNK_SIZE, import_properties
+from core.readers import detect_format, iter_records, open_text
+
+class Command(BaseCommand):
+    help = 'Bulk import properties for one seller from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--seller', required=True, help='Username of the seller the listings belong to')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Input format (default: from the extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--errors', help='Write the rejected rows and their errors to this CSV file')
+
+    def handle(self, *args, **options):
+        seller = User.objects.filter(username=options['seller']).first()
+        if seller is None:
+            raise CommandError(f"No user named {options['seller']}")
+
+        def progress(report):
+            self.stdout.write(f"{report['created']} created, {len(report['errors'])} rejected so far")
+
+        with open_text(options['path']) as stream:
+            records = iter_records(stream, options['format'] or detect_format(options['path']))
+            report = import_properties(seller, enumerate(records, 1), options['chunk_size'], on_chunk=progress)
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as errors_file:
+                writer = csv.writer(errors_file)
+                writer.writerow(['row', 'errors'])
+                for error in report['errors']:
+                    writer.writerow([error['row'], json.dumps(error['errors'])])
+        else:
+            for error in report['errors']:
+                self.stdout.write(self.style.WARNING(f"Row {error['row']}: {json.dumps(error['errors'])}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} properties, {len(report['errors'])} rows rejected"
+        ))
@@ -1,16 +1,133 @@
 import csv
 import json
-from django.core.management.base import BaseCommand
-from django.contrib.gis.geos import Point
-from core.models import IndiaLocation
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core import location_loader
+from core.readers import chunked, detect_format, iter_records, open_text
 
 class Command(BaseCommand):
     help = 'Load India location hierarchy from Census 2011 and PIN code data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='CSV, JSON or NDJSON files; sample data when omitted')
+        parser.add_argument('--format', choices=['csv', 'json', 'ndjson'], help='Input format (default: from the extension)')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--resume', action='store_true', help='Skip the records a previous run already loaded')
+        parser.add_argument('--rejects', help='Write rejected records and the reason to this CSV file')
+        parser.add_argument('--title-case', action='store_true', help='Title-case names (Census files are upper case)')
+
     def handle(self, *args, **options):
-        # This would load from your actual data files
-        # Example implementation with sample data
-        sample_data = [
+        if connection.vendor != 'postgresql':
+            raise CommandError('load_locations needs PostgreSQL (COPY and ON CONFLICT)')
+
+        with connection.cursor() as cursor:
+            location_loader.create_staging_table(cursor)
+
+        rejects_file = open(options['rejects'], 'w', newline='', encoding='utf-8') if options['rejects'] else None
+        rejects = csv.writer(rejects_file) if rejects_file else None
+        try:
+            if options['paths']:
+                totals = [self.load_file(path, options, rejects) for path in options['paths']]
+            else:
+                totals = [self.load_records('sample data', enumerate(self.sample_data(), 1), options, rejects)]
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        inserted, updated, rejected, districts = 0, 0, 0, set()
+        for file_inserted, file_updated, file_rejected, file_districts in totals:
+            inserted += file_inserted
+            updated += file_updated
+            rejected += file_rejected
+            districts |= file_districts
+        if inserted or updated:
+            location_loader.finish_bulk_change(districts)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully loaded location data: {inserted} created, {updated} updated, {rejected} rejected'
+        ))
+        if inserted or updated:
+            self.stdout.write('Run publish_gazetteer to refresh the client snapshots')
+
+    def load_file(self, path, options, rejects):
+        if not os.path.exists(path):
+            raise CommandError(f'No such file: {path}')
+        checkpoint_path = f'{path}.progress'
+        stat = os.stat(path)
+        fingerprint = {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+        skip = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                saved = json.load(checkpoint)
+            if saved.get('size') == fingerprint['size'] and saved.get('mtime') == fingerprint['mtime']:
+                skip = saved['records']
+                self.stdout.write(f'{path}: resuming after {skip} records')
+            else:
+                self.stdout.write(self.style.WARNING(f'{path}: file changed since the checkpoint, starting over'))
+
+        def save_checkpoint(records):
+            with open(checkpoint_path, 'w') as checkpoint:
+                json.dump(dict(fingerprint, records=records), checkpoint)
+
+        with open_text(path) as stream:
+            records = enumerate(iter_records(stream, options['format'] or detect_format(path)), 1)
+            result = self.load_records(path, records, options, rejects, skip=skip, on_chunk=save_checkpoint)
+
+        # A finished file needs no resuming
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return result
+
+    def load_records(self, label, records, options, rejects, skip=0, on_chunk=None):
+        """
+        Normalize, stage and merge (line number, record) pairs one chunk per
+        transaction. Returns (inserted, updated, rejected, changed districts).
+        """
+        inserted, updated, rejected, districts = 0, 0, 0, set()
+        lookup = None
+        started = time.monotonic()
+        last_line = skip
+
+        for chunk in chunked(records, options['chunk_size']):
+            rows = []
+            for line_no, record in chunk:
+                if lookup is None:
+                    lookup = location_loader.field_lookup(record)
+                if line_no <= skip:
+                    continue
+                try:
+                    rows.append((line_no, *location_loader.normalize_location(record, lookup, options['title_case'])))
+                except (ValueError, AttributeError) as e:
+                    rejected += 1
+                    if rejects:
+                        rejects.writerow([label, line_no, str(e), json.dumps(record, default=str)])
+            last_line = chunk[-1][0]
+            if not rows:
+                continue
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                location_loader.copy_to_staging(cursor, rows)
+                chunk_inserted, chunk_updated = location_loader.merge_staging(cursor)
+                location_loader.refresh_changed_locations(chunk_updated)
+            if on_chunk:
+                on_chunk(last_line)
+
+            inserted += chunk_inserted
+            updated += len(chunk_updated)
+            districts.update((state, district) for _, state, district in chunk_updated)
+            rate = (last_line - skip) / max(time.monotonic() - started, 0.001)
+            self.stdout.write(
+                f'{label}: {last_line} records read, {inserted} created, {updated} updated, '
+                f'{rejected} rejected ({rate:.0f} records/s)'
+            )
+
+        return inserted, updated, rejected, districts
+
+    def sample_data(self):
+        return [
             {
                 "state": "Maharashtra",
                 "district": "Mumbai",
@@ -21,18 +138,4 @@ class Command(BaseCommand):
                 "latitude": 18.9220,
                 "census_code": "MH001"
             },
-            # Add more sample data or load from actual files
         ]
-
-        for item in sample_data:
-            IndiaLocation.objects.create(
-                state=item['state'],
-                district=item['district'],
-                sub_district=item['sub_district'],
-                village=item['village'],
-                pin_code=item['pin_code'],
-                centroid=Point(float(item['longitude']), float(item['latitude'])),
-                census_code=item['census_code']
-            )
-
-        self.stdout.write(self.style.SUCCESS('Successfully loaded location data'))
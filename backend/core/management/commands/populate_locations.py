@@ -1,9 +1,25 @@
-from django.core.management.base import BaseCommand
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core import location_loader
 from core.models import IndiaLocation
+from core.readers import chunked, detect_format, iter_records, open_text
+
+# Used for locations whose source has no coordinates
+DEFAULT_CENTROID = (72.8777, 19.0760)
 
 class Command(BaseCommand):
     help = 'Populate sample location data for testing'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync', action='store_true',
+            help='Diff the source against the table in bulk: insert new, update changed, report missing'
+        )
+        parser.add_argument('--source', help='CSV, JSON or NDJSON file to sync from instead of the sample data')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes a sync would make and roll back (implies --sync)')
+
     def handle(self, *args, **options):
         # Sample location data for testing
         sample_locations = [
@@ -658,6 +674,10 @@ class Command(BaseCommand):
             {'state': 'Dadra and Nagar Haveli and Daman and Diu', 'district': 'Diu District', 'sub_district': 'Diu', 'village': 'Diu', 'pin_code': '362520'},
         ]
         
+        # A dry run only exists for the sync path; the plain path would write
+        if options['sync'] or options['source'] or options['dry_run']:
+            return self.sync(sample_locations, options)
+
         created_count = 0
         for location_data in sample_locations:
             location, created = IndiaLocation.objects.get_or_create(
@@ -667,9 +687,8 @@ class Command(BaseCommand):
                 village=location_data['village'],
                 pin_code=location_data['pin_code'],
                 defaults={
-                    'centroid_lat': 19.0760,  # Default coordinates
-                    'centroid_lng': 72.8777,
-                    'census_code': f"{location_data['state'][:3].upper()}{location_data['district'][:3].upper()}{location_data['sub_district'][:3].upper()}{location_data['village'][:3].upper()}"
+                    'centroid': Point(*DEFAULT_CENTROID, srid=4326),  # Default coordinates
+                    'census_code': self.census_code(location_data)
                 }
             )
             if created:
@@ -679,3 +698,61 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {created_count} new locations')
         )
+
+    def census_code(self, location_data):
+        return f"{location_data['state'][:3].upper()}{location_data['district'][:3].upper()}{location_data['sub_district'][:3].upper()}{location_data['village'][:3].upper()}"
+
+    def sync(self, sample_locations, options):
+        """
+        Stage the whole source, then bring the table in line with a few
+        set-based statements, all in one transaction.
+        """
+        if connection.vendor != 'postgresql':
+            raise CommandError('--sync needs PostgreSQL')
+
+        with connection.cursor() as cursor:
+            location_loader.create_staging_table(cursor)
+
+        if options['source']:
+            stream = open_text(options['source'])
+            records = iter_records(stream, detect_format(options['source']))
+        else:
+            stream = None
+            records = (dict(location, census_code=self.census_code(location)) for location in sample_locations)
+
+        rejected = 0
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                lookup = None
+                for chunk in chunked(enumerate(records, 1), options['chunk_size']):
+                    rows = []
+                    for line_no, record in chunk:
+                        if lookup is None:
+                            lookup = location_loader.field_lookup(record)
+                        try:
+                            rows.append((line_no, *location_loader.normalize_location(
+                                record, lookup, require_coordinates=False
+                            )))
+                        except (ValueError, AttributeError) as e:
+                            rejected += 1
+                            self.stdout.write(self.style.WARNING(f'Record {line_no} rejected: {e}'))
+                    location_loader.copy_to_staging(cursor, rows)
+
+                inserted, updated, missing = location_loader.sync_staging(cursor, DEFAULT_CENTROID)
+                location_loader.refresh_changed_locations(updated)
+
+                for pk, state, district, sub_district, village in missing:
+                    self.stdout.write(f'Not in source: {village}, {sub_district}, {district}, {state} (id {pk})')
+                if options['dry_run']:
+                    transaction.set_rollback(True)
+        finally:
+            if stream is not None:
+                stream.close()
+
+        summary = f'{inserted} created, {len(updated)} updated, {len(missing)} not in source, {rejected} rejected'
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run, nothing changed: {summary}'))
+            return
+        if inserted or updated:
+            location_loader.finish_bulk_change({(state, district) for _, state, district in updated})
+        self.stdout.write(self.style.SUCCESS(f'Synced locations: {summary}'))
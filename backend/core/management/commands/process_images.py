@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from core import image_variants
+from core.images import mark_failed, process_image
+from core.models import PropertyImage
+
+class Command(BaseCommand):
+    help = 'Process property images that are still pending or failed before: strip metadata and generate variants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reprocess images that already have variants')
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.order_by('id')
+        if not options['all']:
+            images = images.exclude(status=PropertyImage.READY)
+        ids = list(images.values_list('id', flat=True))
+
+        failed = 0
+        for count, pk in enumerate(ids, 1):
+            try:
+                process_image(pk, render=image_variants.render_variants)
+            except Exception as e:
+                failed += 1
+                mark_failed(pk)
+                self.stdout.write(self.style.WARNING(f'PropertyImage {pk}: {e}'))
+            if count % 100 == 0:
+                self.stdout.write(f'Processed {count} of {len(ids)} images')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(ids) - failed} images, {failed} failed'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from core import gazetteer
+
+class Command(BaseCommand):
+    help = 'Publish the location hierarchy as content-hashed, gzip-compressed snapshots for clients'
+
+    def handle(self, *args, **options):
+        manifest = gazetteer.publish()
+        snapshot = manifest['all']
+        self.stdout.write(f"{snapshot['name']}: {snapshot['size']} bytes")
+        for state, snapshot in manifest['states'].items():
+            self.stdout.write(f"{state}: {snapshot['name']}, {snapshot['size']} bytes")
+        self.stdout.write(self.style.SUCCESS(f"Published gazetteer for {len(manifest['states'])} states"))
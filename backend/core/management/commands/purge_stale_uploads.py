@@ -0,0 +1,20 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import ImageUpload
+from core.uploads import discard_part
+
+class Command(BaseCommand):
+    help = 'Delete resumable image uploads that were abandoned before being finalized'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Age after which an unfinished upload is abandoned')
+
+    def handle(self, *args, **options):
+        stale = ImageUpload.objects.filter(created_at__lt=timezone.now() - timedelta(hours=options['hours']))
+        count = 0
+        for upload in stale.iterator():
+            discard_part(upload)
+            count += 1
+        stale.delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} abandoned uploads'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from core.models import Property
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vector of every property'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+
+        # Walk the table in id order so each UPDATE only locks one batch
+        while True:
+            ids = list(
+                Property.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += Property.objects.filter(id__in=ids).update_search_vectors()
+            last_id = ids[-1]
+            self.stdout.write(f'Updated {total} properties')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {total} properties'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from core.models import Property, Shortlist
+
+class Command(BaseCommand):
+    help = 'Repair Property.shortlist_count where it has drifted from the Shortlist table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drifted properties')
+
+    def handle(self, *args, **options):
+        counts = Shortlist.objects.filter(property=OuterRef('pk')).order_by() \
+            .values('property').annotate(total=Count('*')).values('total')
+        actual = Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+        with transaction.atomic():
+            drifted = Property.objects.order_by().annotate(actual=actual) \
+                .exclude(shortlist_count=F('actual'))
+            if options['dry_run']:
+                for pk, stored, real in drifted.values_list('id', 'shortlist_count', 'actual'):
+                    self.stdout.write(f'Property {pk}: stored {stored}, actual {real}')
+                self.stdout.write(self.style.SUCCESS(f'{drifted.count()} properties have drifted'))
+                return
+
+            # Lock the drifted rows so concurrent increments wait for the repair
+            ids = list(drifted.select_for_update().values_list('id', flat=True))
+            fixed = Property.objects.filter(id__in=ids).update(shortlist_count=actual)
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled shortlist counts for {fixed} properties'))
@@ -1,13 +1,20 @@
 import uuid
 import os
 from django.contrib.gis.db import models
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db.models import Count
+from django.db import connection
+from django.db.models import Count, OuterRef, Prefetch, Subquery
 from django.utils import timezone
 from django.conf import settings
 from datetime import timedelta
 
+from .geo import AsGeometry, KNNDistance
+
 def property_image_upload_path(instance, filename):
     return f'properties/{instance.property.id}/images/{uuid.uuid4()}{os.path.splitext(filename)[1]}'
 
@@ -41,6 +48,19 @@ class User(AbstractUser):
             return True
         return False
 
+class IndiaLocationQuerySet(models.QuerySet):
+    def nearest(self, latitude, longitude):
+        """
+        The location whose centroid is closest to the point, with its
+        `distance`, or None. Ordered by the KNN operator so the GiST index
+        on centroid finds it without measuring every row.
+        """
+        point = Point(longitude, latitude, srid=4326)
+        return self.annotate(
+            distance=Distance('centroid', point),
+            knn_distance=KNNDistance('centroid', point),
+        ).order_by('knn_distance').first()
+
 class IndiaLocation(models.Model):
     state = models.CharField(max_length=100)
     district = models.CharField(max_length=100)
@@ -50,12 +70,51 @@ class IndiaLocation(models.Model):
     centroid = models.PointField(geography=True)
     census_code = models.CharField(max_length=15)
 
+    objects = IndiaLocationQuerySet.as_manager()
+
     class Meta:
+        # The unique index doubles as the index for state -> district ->
+        # sub_district -> village prefix lookups
         unique_together = ('state', 'district', 'sub_district', 'village')
+        indexes = [
+            # Fuzzy typeahead (pg_trgm, created by core.signals.create_postgres_extensions)
+            GinIndex(fields=['village'], opclasses=['gin_trgm_ops'], name='location_village_trgm'),
+            GinIndex(fields=['sub_district'], opclasses=['gin_trgm_ops'], name='location_sub_district_trgm'),
+            GinIndex(fields=['district'], opclasses=['gin_trgm_ops'], name='location_district_trgm'),
+            # LIKE 'prefix%' on pin codes
+            models.Index(fields=['pin_code'], opclasses=['varchar_pattern_ops'], name='location_pin_code_prefix'),
+        ]
 
     def __str__(self):
         return f"{self.village}, {self.sub_district}, {self.district}, {self.state}"
 
+SEARCH_CONFIG = 'english'
+
+def property_search_vector():
+    """Weighted document for keyword search: title, then location names, address, description"""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(
+            'location__village', 'location__sub_district', 'location__district',
+            'location__state', 'location__pin_code', weight='B', config=SEARCH_CONFIG
+        )
+        + SearchVector('address', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+    )
+
+class PropertyQuerySet(models.QuerySet):
+    def update_search_vectors(self):
+        """Recompute search_vector for these rows in one UPDATE"""
+        vectors = Property.objects.filter(pk=OuterRef('pk')).order_by() \
+            .annotate(vector=property_search_vector()).values('vector')
+        return self.order_by().update(search_vector=Subquery(vectors))
+
+    def with_details(self):
+        """Everything PropertySerializer reads, fetched in two queries for any number of rows"""
+        return self.select_related('location', 'seller').prefetch_related(
+            Prefetch('images', queryset=PropertyImage.objects.visible())
+        ).defer('search_vector')
+
 class Property(models.Model):
     PROPERTY_TYPES = (
         ('AGRICULTURE', 'Agriculture Land'),
@@ -78,13 +137,50 @@ class Property(models.Model):
     youtube_link = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by core.signals, see property_search_vector()
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Number of Shortlist rows, kept in step by core.signals; see reconcile_shortlist_counts
+    shortlist_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PropertyQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        # One index per search access path: an optional equality filter,
+        # then the sort column and id (the keyset tie-breaker). B-tree indexes
+        # are scanned backwards for descending sorts.
+        indexes = [
+            GinIndex(fields=['search_vector'], name='property_search_vector_gin'),
+            models.Index(fields=['created_at', 'id'], name='property_created'),
+            models.Index(fields=['price', 'id'], name='property_price'),
+            models.Index(fields=['area', 'id'], name='property_area'),
+            models.Index(fields=['shortlist_count', 'id'], name='property_popularity'),
+            models.Index(fields=['property_type', 'created_at', 'id'], name='property_type_created'),
+            models.Index(fields=['property_type', 'price', 'id'], name='property_type_price'),
+            models.Index(fields=['property_type', 'area', 'id'], name='property_type_area'),
+            models.Index(fields=['location', 'created_at', 'id'], name='property_location_created'),
+            models.Index(fields=['seller', 'created_at', 'id'], name='property_seller_created'),
+            # Map viewport and tile filters (geo.InEnvelope over geo.AsGeometry)
+            GistIndex(AsGeometry('geo_location'), name='property_geometry'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_property_type_display()})"
 
+    def save(self, *args, **kwargs):
+        # shortlist_count only changes through F() updates (core.signals);
+        # writing back the value loaded with this instance would undo the
+        # shortlists added or removed since. Ask for it in update_fields to
+        # write it anyway.
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'shortlist_count' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def price_per_unit(self):
         if self.property_type in ['AGRICULTURE', 'OPEN_PLOT', 'FLAT', 'COMMERCIAL']:
@@ -93,38 +189,149 @@ class Property(models.Model):
 
     @property
     def shortlisted_by_count(self):
-        try:
-            return self.shortlisted_by.count()
-        except Exception:
-            return 0
+        return self.shortlist_count
+
+class PropertyImageQuerySet(models.QuerySet):
+    def visible(self):
+        """Images that may be shown: failed ones still carry their original metadata"""
+        return self.exclude(status=self.model.FAILED)
+
+    def attach(self, property_id, names):
+        """
+        Insert images already in storage for one property in a single
+        statement, which also makes the first of them primary unless the
+        property has a primary image. Returns the new ids in order.
+        """
+        if not names:
+            return []
+        table = self.model._meta.db_table
+        rows = ', '.join(['(%s, %s)'] * len(names))
+        params = [value for position, name in enumerate(names, 1) for value in (name, position)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table} (property_id, image, is_primary, variants, status)
+                SELECT %s, upload.image, upload.position = 1 AND NOT EXISTS (
+                    SELECT 1 FROM {table} WHERE property_id = %s AND is_primary
+                ), '{{}}'::jsonb, %s
+                FROM (VALUES {rows}) AS upload (image, position)
+                ORDER BY upload.position
+                RETURNING id
+            """, [property_id, property_id, self.model.PENDING, *params])
+            return [row[0] for row in cursor.fetchall()]
 
 class PropertyImage(models.Model):
+    PENDING = 'PENDING'
+    READY = 'READY'
+    FAILED = 'FAILED'
+    STATUSES = (
+        (PENDING, 'Waiting to be processed'),
+        (READY, 'Processed'),
+        # Still carries its original metadata; hidden until processing succeeds
+        (FAILED, 'Processing failed'),
+    )
+
     property = models.ForeignKey(Property, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to=property_image_upload_path)
     is_primary = models.BooleanField(default=False)
+    # Resized copies written by core.images:
+    # {name: {'width': ..., 'height': ..., 'webp': path, 'jpeg': path}}
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING, editable=False)
+
+    objects = PropertyImageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only primary images, for the card view's primary image lookup
+            models.Index(fields=['property'], condition=models.Q(is_primary=True), name='propertyimage_primary'),
+        ]
 
     def __str__(self):
         return f"Image for {self.property.title}"
 
+class ShortlistQuerySet(models.QuerySet):
+    def with_property_details(self):
+        """Prefetch the nested properties so ShortlistSerializer does not query per row"""
+        return self.prefetch_related(Prefetch('property', queryset=Property.objects.with_details()))
+
 class Shortlist(models.Model):
     buyer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='shortlisted')
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='shortlisted_by')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ShortlistQuerySet.as_manager()
+
     class Meta:
         unique_together = ('buyer', 'property')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['buyer', 'created_at'], name='shortlist_buyer_created'),
+        ]
 
     def __str__(self):
         return f"{self.buyer.username} shortlisted {self.property.title}"
 
+class ImageUpload(models.Model):
+    """
+    A resumable upload of one property image, appended to a file on local
+    disk chunk by chunk (see core.uploads) until `received` reaches `size`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='image_uploads')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='image_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.received}/{self.size} bytes)"
+
 class PropertyView(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='views')
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the view happened, not when core.view_tracking flushed it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
         return f"View of {self.property.title} by {self.user.username if self.user else 'Anonymous'}"
+
+class PropertyViewDailyQuerySet(models.QuerySet):
+    def add(self, counts):
+        """
+        Add {(property_id, date): views} to the rollups in one upsert, so
+        concurrent flushes from several processes sum rather than overwrite.
+        """
+        if not counts:
+            return
+        table = self.model._meta.db_table
+        rows = ', '.join(['(%s, %s, %s)'] * len(counts))
+        params = [value for (property_id, date), views in counts.items() for value in (property_id, date, views)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table} AS daily (property_id, date, views)
+                VALUES {rows}
+                ON CONFLICT (property_id, date) DO UPDATE SET views = daily.views + EXCLUDED.views
+            """, params)
+
+class PropertyViewDaily(models.Model):
+    """Views of one property on one day, written by core.view_tracking"""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    objects = PropertyViewDailyQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('property', 'date')
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.views} views of property {self.property_id} on {self.date}"
@@ -0,0 +1,200 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import FloatField, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination over whatever ordering the queryset already has.
+
+    The cursor stores the ordering values of the last row on the page plus its
+    id, so the next page is a `WHERE (col, id) > (value, last_id)` range scan
+    instead of an OFFSET. Deep pages cost the same as the first one and rows
+    inserted while a client is paging never shift or duplicate results.
+
+    Every column in the ordering must be non-null.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        # Fetch one extra row to learn whether there is a next page without a COUNT.
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def paginate_positions(self, queryset, positions, request, ordering=None):
+        """
+        Page over a precomputed, ordered list of cursor positions (as produced
+        by get_position_value, id last) and load just that page's rows, in
+        the list's order. `ordering` names the position columns when they
+        are not the queryset's own ordering. Returns None when the request's
+        cursor is not in the list.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = ordering or self.get_ordering(queryset)
+
+        position = self.decode_cursor(request)
+        try:
+            start = 0 if position is None else positions.index(position) + 1
+        except ValueError:
+            return None
+
+        ids = [row[-1] for row in positions[start:start + self.page_size]]
+        self.has_next = start + self.page_size < len(positions)
+        rows = {
+            row['id'] if isinstance(row, dict) else row.pk: row
+            for row in (queryset.order_by().filter(id__in=ids) if ids else [])
+        }
+        self.page = [rows[pk] for pk in ids if pk in rows]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Use the queryset's own ordering and append `id` as a tie-breaker so
+        every row has a unique position.
+        """
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        ordering = [field for field in ordering if isinstance(field, str)]
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def get_keyset_filter(self, position):
+        """
+        Build `a >= x AND ((a > x) OR (a = x AND b > y) OR ...)` honouring the
+        direction of each ordering column. The leading bound is implied by the
+        rest, but PostgreSQL can only start an index range scan from a plain
+        comparison, not from the OR.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first = self.ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self.get_position_value(last, field.lstrip('-')) for field in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(position))
+
+    def get_position_value(self, instance, field):
+        if isinstance(instance, dict):
+            # Rows of a .values() queryset
+            value = instance[field]
+        else:
+            value = instance
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+        # Distance annotations come back as measure objects; the lookup wants metres.
+        if hasattr(value, 'm'):
+            return value.m
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def encode_cursor(self, position):
+        return b64encode(json.dumps(position).encode('utf-8'), altchars=b'-_').decode('ascii')
+
+    def decode_cursor(self, request, queryset=None):
+        """
+        The position in the request's cursor, or None on the first page. With
+        a `queryset`, each value is converted to its ordering column's type, so
+        a forged cursor is a 404 here rather than a database error later.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode('ascii'), altchars=b'-_').decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor minted under a different sort order cannot be applied.
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if queryset is not None:
+            try:
+                position = [
+                    self.get_position_field(queryset, field.lstrip('-')).to_python(value)
+                    for field, value in zip(self.ordering, position)
+                ]
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if None in position:
+                raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_position_field(self, queryset, name):
+        """The model field or annotation output field a cursor value is compared with"""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            field = annotation.output_field
+            # Distance annotations are compared in metres (see get_position_value)
+            return FloatField() if field.get_internal_type() == 'DistanceField' else field
+        model = queryset.model
+        for part in name.split('__'):
+            field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            model = field.related_model
+        return field
@@ -0,0 +1,104 @@
+"""
+Column-level projections of Property for list and map views.
+
+Instead of instantiating models and running PropertySerializer (nested
+seller, location, every image and several method fields per row), a
+projection selects only the requested columns with `.values()` and turns
+each row dict into the response dict directly.
+"""
+from django.db.models import CharField, F, OuterRef, Subquery
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce
+from django.utils.encoding import filepath_to_uri
+
+from .geo import Latitude, Longitude
+from .models import PropertyImage
+
+# Fields returned by `?view=card`
+CARD_FIELDS = (
+    'id', 'property_type', 'title', 'price', 'area', 'latitude', 'longitude',
+    'village', 'district', 'state', 'primary_image', 'shortlisted_count', 'created_at',
+)
+
+
+def _primary_image():
+    # The primary image (found through the partial propertyimage_primary
+    # index), else the first image; its card-sized variant once processed
+    images = PropertyImage.objects.visible().filter(property=OuterRef('pk')).order_by('id').annotate(
+        card_image=Coalesce(KeyTextTransform('jpeg', 'variants__card'), 'image', output_field=CharField())
+    ).values('card_image')
+    return Coalesce(Subquery(images.filter(is_primary=True)[:1]), Subquery(images[:1]))
+
+
+# Every field a sparse fieldset (`?fields=a,b,c`) may ask for
+PROJECTION_FIELDS = {
+    'id': lambda: F('id'),
+    'property_type': lambda: F('property_type'),
+    'title': lambda: F('title'),
+    'description': lambda: F('description'),
+    'address': lambda: F('address'),
+    'price': lambda: F('price'),
+    'area': lambda: F('area'),
+    'youtube_link': lambda: F('youtube_link'),
+    'created_at': lambda: F('created_at'),
+    'updated_at': lambda: F('updated_at'),
+    'latitude': lambda: Latitude('geo_location'),
+    'longitude': lambda: Longitude('geo_location'),
+    'village': lambda: F('location__village'),
+    'sub_district': lambda: F('location__sub_district'),
+    'district': lambda: F('location__district'),
+    'state': lambda: F('location__state'),
+    'pin_code': lambda: F('location__pin_code'),
+    'shortlisted_count': lambda: F('shortlist_count'),
+    'primary_image': _primary_image,
+}
+
+
+def get_projection_fields(query_params):
+    """
+    The fields requested with `view=card` or `fields=`, or None when the full
+    serializer should be used. Raises ValueError for unknown field names.
+    """
+    requested = query_params.get('fields', '').strip()
+    if requested:
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in PROJECTION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(PROJECTION_FIELDS)}")
+        return fields
+    if query_params.get('view') == 'card':
+        return list(CARD_FIELDS)
+    return None
+
+
+def project_properties(queryset, fields):
+    """
+    `.values()` queryset with the requested fields under `p_`-prefixed keys
+    (so they cannot clash with model field names). The ordering columns are
+    selected under their own names so the keyset paginator can read cursor
+    positions off the rows.
+    """
+    selected = {f'p_{name}': PROJECTION_FIELDS[name]() for name in fields}
+    ordering = [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)]
+    return queryset.values(*dict.fromkeys(ordering + ['id']), **selected)
+
+
+class ProjectionRenderer:
+    """Turns projected rows into response dicts without per-field dispatch"""
+
+    def __init__(self, fields, request):
+        self.fields = fields
+        self.keys = [(name, f'p_{name}') for name in fields]
+        self.media_prefix = request.build_absolute_uri(PropertyImage._meta.get_field('image').storage.url(''))
+
+    def render(self, rows):
+        keys = self.keys
+        has_image = 'primary_image' in self.fields
+        media_prefix = self.media_prefix
+        data = []
+        for row in rows:
+            item = {name: row[key] for name, key in keys}
+            if has_image and item['primary_image']:
+                item['primary_image'] = media_prefix + filepath_to_uri(item['primary_image'])
+            data.append(item)
+        return data
@@ -0,0 +1,107 @@
+"""
+Bulk import of properties for one seller from CSV or NDJSON records.
+
+Rows are validated in chunks with PropertyImportSerializer. All locations a
+chunk names are fetched with one query, and the valid rows are written
+with one bulk_create per chunk. Rows with errors are skipped and reported
+by their row number; they never roll back the rest of the chunk.
+"""
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+
+from . import search_cache
+from .models import IndiaLocation, Property
+from .readers import chunked
+from .serializers import PropertyImportSerializer
+from .spatial_index import property_index
+
+DEFAULT_CHUNK_SIZE = 1000
+LOCATION_FIELDS = ('state', 'district', 'sub_district', 'village')
+
+
+def import_properties(seller, records, chunk_size=DEFAULT_CHUNK_SIZE, on_chunk=None):
+    """
+    Import (row number, record) pairs. Returns {'created': count, 'errors':
+    [{'row': n, 'errors': {field: [messages]}}]}. `on_chunk(report)` is
+    called after each chunk commits.
+    """
+    report = {'created': 0, 'errors': []}
+    for chunk in chunked(records, chunk_size):
+        valid = []
+        for row, record in chunk:
+            if not isinstance(record, dict):
+                report['errors'].append({'row': row, 'errors': {'non_field_errors': ['Expected an object']}})
+                continue
+            # Empty CSV cells mean "not given"
+            data = {key: value for key, value in record.items() if value not in ('', None)}
+            serializer = PropertyImportSerializer(data=data)
+            if serializer.is_valid():
+                valid.append((row, serializer.validated_data))
+            else:
+                report['errors'].append({'row': row, 'errors': serializer.errors})
+
+        created = import_chunk(seller, valid, report['errors'])
+        report['created'] += created
+        if on_chunk:
+            on_chunk(report)
+    return report
+
+
+def import_chunk(seller, rows, errors):
+    locations = resolve_locations([
+        tuple(' '.join(data[field].split()) for field in LOCATION_FIELDS) for _, data in rows
+    ])
+
+    properties = []
+    for row, data in rows:
+        key = tuple(' '.join(data.pop(field).split()) for field in LOCATION_FIELDS)
+        location = locations.get(key)
+        if location is None:
+            errors.append({'row': row, 'errors': {'location': [f"Unknown location: {', '.join(key)}"]}})
+            continue
+        latitude, longitude = data.pop('latitude', None), data.pop('longitude', None)
+        if latitude is not None and longitude is not None:
+            point = Point(longitude, latitude, srid=4326)
+        else:
+            # No coordinates: place the listing at its village
+            point = location.centroid
+        properties.append(Property(seller=seller, location=location, geo_location=point, **data))
+
+    if not properties:
+        return 0
+
+    with transaction.atomic():
+        created = Property.objects.bulk_create(properties)
+        ids = [prop.pk for prop in created]
+        # bulk_create skips the post_save signals; do their work in bulk
+        if connection.vendor == 'postgresql':
+            Property.objects.filter(id__in=ids).update_search_vectors()
+        districts = {(prop.location.state, prop.location.district) for prop in created}
+        transaction.on_commit(lambda: after_import(created, districts))
+    return len(created)
+
+
+def resolve_locations(keys):
+    """{(state, district, sub_district, village): IndiaLocation} for the keys that exist, in one query"""
+    keys = set(keys)
+    if not keys:
+        return {}
+    columns = list(zip(*keys))
+    # Each column's IN list narrows the unique index scan; exact tuples are matched below
+    candidates = IndiaLocation.objects.filter(**{
+        f'{field}__in': set(values) for field, values in zip(LOCATION_FIELDS, columns)
+    })
+    locations = {}
+    for location in candidates:
+        key = tuple(getattr(location, field) for field in LOCATION_FIELDS)
+        if key in keys:
+            locations[key] = location
+    return locations
+
+
+def after_import(created, districts):
+    for state, district in districts:
+        search_cache.invalidate_location(state, district)
+    if property_index is not None and property_index.is_built:
+        for prop in created:
+            property_index.update(prop.pk, prop.geo_location.y, prop.geo_location.x)
@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryRecorder:
+    """
+    Records every SQL statement run on a connection together with its duration.
+    Uses an execute wrapper, so it works with DEBUG off as well.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.queries) * 1000
+
+
+class QueryBudgetMixin:
+    """
+    Viewset mixin that measures the SQL issued by each action and compares it
+    with the budget declared in `query_budgets`, e.g. `{'list': 4}`.
+
+    Over-budget requests are reported on stdout. With DEBUG on (or
+    QUERY_BUDGET_HEADERS set) the numbers are also returned as
+    `X-Query-Count` / `X-Query-Time-Ms` response headers.
+    """
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        with QueryRecorder() as recorder:
+            response = super().dispatch(request, *args, **kwargs)
+
+        action = getattr(self, 'action', None)
+        budget = self.query_budgets.get(action)
+        if budget is not None and recorder.count > budget:
+            print(
+                f"Query budget exceeded for {self.__class__.__name__}.{action}: "
+                f"{recorder.count} queries (budget {budget}) in {recorder.total_ms:.1f} ms"
+            )
+
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = f"{recorder.total_ms:.1f}"
+        return response
@@ -0,0 +1,87 @@
+"""
+Streaming readers for bulk import files. Records are yielded one at a time
+so memory use does not grow with the size of the file.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+READ_SIZE = 64 * 1024
+
+
+def detect_format(name):
+    lowered = name.lower()
+    if lowered.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if lowered.endswith('.json'):
+        return 'json'
+    return 'csv'
+
+
+def iter_records(stream, file_format):
+    """
+    Yield dicts from a text stream in `csv` (header row), `ndjson` (one
+    object per line) or `json` (an array of objects) format.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif file_format == 'ndjson':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    elif file_format == 'json':
+        yield from iter_json_array(stream)
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+
+def iter_json_array(stream):
+    """Decode the elements of a top-level JSON array without loading the whole document"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Skip whitespace and separators between elements
+        while position < len(buffer) and buffer[position] in ' \t\r\n,' + ('' if started else '['):
+            if buffer[position] == '[':
+                started = True
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError('buffer exhausted')
+            record, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            # Incomplete element: read more, or fail if there is nothing left
+            if eof:
+                if buffer[position:].strip():
+                    raise ValueError('Truncated JSON array')
+                return
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if not started:
+            raise ValueError('Expected a JSON array')
+        yield record
+        position = end
+
+
+def chunked(iterable, size):
+    """Lists of up to `size` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def open_text(path):
+    """Open an import file as text, tolerating a UTF-8 byte order mark"""
+    return io.open(path, 'r', encoding='utf-8-sig', newline='')
@@ -0,0 +1,62 @@
+"""
+Cache of property search results.
+
+A search is cached as the ordered list of keyset cursor positions of every
+match (the last element of each position is the property id) and pages are
+hydrated from the database by id. Entries are namespaced by version stamps:
+
+- searches filtered to one district use that district's version, all other
+  searches use the global version; a change to a property bumps its district
+  and the global version, so district-scoped searches elsewhere stay cached;
+- searches sorted by popularity also use the popularity version, bumped by
+  shortlist changes.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from .versioning import bump_version, get_version
+
+SEARCH_CACHE_TIMEOUT = 300
+# Larger result sets are not cached; they are paged straight from the database
+SEARCH_CACHE_MAX_RESULTS = 1000
+# Marker stored for searches known to exceed SEARCH_CACHE_MAX_RESULTS
+TOO_BROAD = 'too-broad'
+
+GLOBAL_VERSION_KEY = 'property-search-version:all'
+POPULARITY_VERSION_KEY = 'property-search-version:popularity'
+
+
+def district_version_key(state, district):
+    return f'property-search-version:district:{hashlib.md5(f"{state}|{district}".encode("utf-8")).hexdigest()}'
+
+
+def search_version(district=None, state=None, popularity=False):
+    """Combined version stamp of everything a search's results depend on"""
+    versions = [get_version(district_version_key(state, district) if district else GLOBAL_VERSION_KEY)]
+    if popularity:
+        versions.append(get_version(POPULARITY_VERSION_KEY))
+    return ':'.join(str(v) for v in versions)
+
+
+def search_key(filter_key, ordering, district=None, state=None, popularity=False):
+    digest = hashlib.md5(f'{filter_key}|{",".join(ordering)}'.encode('utf-8')).hexdigest()
+    return f'property-search:{search_version(district, state, popularity)}:{digest}'
+
+
+def get_positions(key):
+    return cache.get(key)
+
+
+def set_positions(key, positions):
+    cache.set(key, positions, SEARCH_CACHE_TIMEOUT)
+
+
+def invalidate_location(state, district):
+    """A property in this district was added, changed or removed"""
+    bump_version(GLOBAL_VERSION_KEY)
+    bump_version(district_version_key(state, district))
+
+
+def invalidate_popularity():
+    bump_version(POPULARITY_VERSION_KEY)
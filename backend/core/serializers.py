@@ -2,7 +2,10 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import update_last_login
 from rest_framework.authtoken.models import Token
+from django.db import DatabaseError
 from django.contrib.gis.geos import Point
+from . import images
+from .geo import REVERSE_GEOCODE_MAX_KM
 from .models import User, Property, Shortlist, IndiaLocation, PropertyImage
 
 class UserSerializer(serializers.ModelSerializer):
@@ -135,10 +138,16 @@ class IndiaLocationSerializer(serializers.ModelSerializer):
 
 class PropertyImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    # Resized WebP and JPEG variants as <img srcset> values; null until processed
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image', 'image_url', 'is_primary']
+        fields = ['id', 'image', 'image_url', 'is_primary', 'srcset']
+
+    def get_srcset(self, obj):
+        request = self.context.get('request')
+        return images.variant_urls(obj, request.build_absolute_uri if request else str)
     
     def get_image_url(self, obj):
         if obj.image:
@@ -153,11 +162,12 @@ class PropertyImageSerializer(serializers.ModelSerializer):
         return None
 
 class PropertyCreateSerializer(serializers.ModelSerializer):
-    state = serializers.CharField(write_only=True)
-    district = serializers.CharField(write_only=True)
-    sub_district = serializers.CharField(write_only=True)
-    village = serializers.CharField(write_only=True)
-    pin_code = serializers.CharField(write_only=True)
+    # Optional when latitude/longitude resolve to a known location
+    state = serializers.CharField(write_only=True, required=False)
+    district = serializers.CharField(write_only=True, required=False)
+    sub_district = serializers.CharField(write_only=True, required=False)
+    village = serializers.CharField(write_only=True, required=False)
+    pin_code = serializers.CharField(write_only=True, required=False)
     latitude = serializers.FloatField(write_only=True, required=False)
     longitude = serializers.FloatField(write_only=True, required=False)
     
@@ -169,13 +179,46 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             'latitude', 'longitude', 'price', 'area', 'youtube_link'
         ]
 
+    hierarchy_fields = ('state', 'district', 'sub_district', 'village')
+
+    def validate(self, data):
+        # The location the seller names wins; coordinates only fill it in when it is not given
+        missing = [field for field in self.hierarchy_fields if not data.get(field)]
+        if missing:
+            has_coordinates = data.get('latitude') is not None and data.get('longitude') is not None
+            if has_coordinates:
+                data['resolved_location'] = self.resolve_location(data['latitude'], data['longitude'])
+            if not data.get('resolved_location'):
+                raise serializers.ValidationError({
+                    field: 'This field is required unless latitude and longitude are given.' for field in missing
+                })
+        elif not data.get('pin_code') and not IndiaLocation.objects.filter(
+            **{field: data[field] for field in self.hierarchy_fields}
+        ).exists():
+            # Only a location that is not known yet needs its pin code
+            raise serializers.ValidationError({'pin_code': 'This field is required for a new location.'})
+        return data
+
+    def resolve_location(self, latitude, longitude):
+        """Nearest known location within REVERSE_GEOCODE_MAX_KM, from one KNN index lookup"""
+        try:
+            location = IndiaLocation.objects.nearest(latitude, longitude)
+        except DatabaseError as e:
+            # No PostGIS KNN support (e.g. SQLite)
+            print(f"Reverse geocoding failed: {e}")
+            return None
+        if location is None or location.distance.km > REVERSE_GEOCODE_MAX_KM:
+            return None
+        return location
+
     def create(self, validated_data):
         # Extract location data
-        state = validated_data.pop('state')
-        district = validated_data.pop('district')
-        sub_district = validated_data.pop('sub_district')
-        village = validated_data.pop('village')
-        pin_code = validated_data.pop('pin_code')
+        resolved_location = validated_data.pop('resolved_location', None)
+        state = validated_data.pop('state', None)
+        district = validated_data.pop('district', None)
+        sub_district = validated_data.pop('sub_district', None)
+        village = validated_data.pop('village', None)
+        pin_code = validated_data.pop('pin_code', None)
         latitude = validated_data.pop('latitude', None)
         longitude = validated_data.pop('longitude', None)
         
@@ -198,26 +241,23 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             centroid_point = None
             geo_location_point = None
         
-        # Get or create location
-        location, created = IndiaLocation.objects.get_or_create(
-            state=state,
-            district=district,
-            sub_district=sub_district,
-            village=village,
-            pin_code=pin_code,
-            defaults={
-                'centroid': centroid_point,
-                'census_code': f"{state[:3].upper()}{district[:3].upper()}{sub_district[:3].upper()}{village[:3].upper()}"
-            }
-        )
-        
-        # Update centroid if coordinates are provided and location already existed
-        if not created and latitude and longitude and centroid_point:
-            try:
-                location.centroid = centroid_point
-                location.save()
-            except Exception as e:
-                print(f"Failed to update location centroid: {e}")
+        if resolved_location is not None:
+            # Coordinates near a known location: no text matching, no new location row
+            location = resolved_location
+        else:
+            # Get or create location by its natural key. An existing location's
+            # centroid is shared by every property in it and is left alone.
+            location, created = IndiaLocation.objects.get_or_create(
+                state=state,
+                district=district,
+                sub_district=sub_district,
+                village=village,
+                defaults={
+                    'pin_code': pin_code,
+                    'centroid': centroid_point,
+                    'census_code': f"{state[:3].upper()}{district[:3].upper()}{sub_district[:3].upper()}{village[:3].upper()}"
+                }
+            )
         
         # Create property
         property = Property.objects.create(
@@ -226,21 +266,15 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Handle images if any
+        # Handle images if any: store the originals in one INSERT, first image
+        # primary, and leave resizing to the background workers
         images_data = self.context.get('request').FILES
         if images_data:
-            for image_data in images_data.getlist('images'):
-                PropertyImage.objects.create(
-                    property=property,
-                    image=image_data,
-                    is_primary=False
-                )
-            
-            # Set first image as primary
-            if property.images.exists():
-                first_image = property.images.first()
-                first_image.is_primary = True
-                first_image.save()
+            uploaded = PropertyImage.objects.bulk_create([
+                PropertyImage(property=property, image=image_data, is_primary=index == 0)
+                for index, image_data in enumerate(images_data.getlist('images'))
+            ])
+            images.schedule(image.pk for image in uploaded)
         
         return property
 
@@ -282,6 +316,23 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
                 'area_display': f"{instance.area} {'acres' if instance.property_type == 'AGRICULTURE' else 'sq yds' if instance.property_type in ['OPEN_PLOT', 'HOUSE', 'BUILDING'] else 'sq ft'}"
             }
 
+class PropertyImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk import; the location must already exist (see core.property_import)"""
+    state = serializers.CharField(write_only=True)
+    district = serializers.CharField(write_only=True)
+    sub_district = serializers.CharField(write_only=True)
+    village = serializers.CharField(write_only=True)
+    latitude = serializers.FloatField(write_only=True, required=False, allow_null=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(write_only=True, required=False, allow_null=True, min_value=-180, max_value=180)
+
+    class Meta:
+        model = Property
+        fields = [
+            'property_type', 'title', 'description', 'address',
+            'state', 'district', 'sub_district', 'village',
+            'latitude', 'longitude', 'price', 'area', 'youtube_link'
+        ]
+
 class PropertySerializer(serializers.ModelSerializer):
     images = PropertyImageSerializer(many=True, read_only=True)
     seller = UserSerializer(read_only=True)
@@ -345,15 +396,8 @@ class PropertySerializer(serializers.ModelSerializer):
             return None
 
     def get_shortlisted_count(self, obj):
-        try:
-            # Use the model's property method
-            return obj.shortlisted_by_count
-        except Exception:
-            try:
-                # Fallback to direct count
-                return obj.shortlisted_by.count()
-            except Exception:
-                return 0
+        # Denormalized counter, no query against the Shortlist table
+        return obj.shortlist_count
 
     def to_representation(self, instance):
         """
@@ -0,0 +1,140 @@
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search_cache
+from .models import IndiaLocation, Property, PropertyImage, Shortlist, User
+from .spatial_index import property_index
+from .versioning import LOCATION_VERSION_KEY, USER_VERSION_KEY, bump_version
+
+
+def create_postgres_extensions(sender, using, **kwargs):
+    """pre_migrate hook: extensions the model indexes depend on must exist first"""
+    db = connections[using]
+    if db.vendor == 'postgresql':
+        with db.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+@receiver(post_save, sender=Property)
+def index_property_location(sender, instance, **kwargs):
+    """Keep the in-process fallback spatial index current once it has been built"""
+    if property_index is None or not property_index.is_built:
+        return
+    point = instance.geo_location
+    latitude, longitude = (point.y, point.x) if point else (None, None)
+    transaction.on_commit(lambda: property_index.update(instance.pk, latitude, longitude))
+
+
+@receiver(post_delete, sender=Property)
+def unindex_property_location(sender, instance, **kwargs):
+    if property_index is None or not property_index.is_built:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: property_index.remove(pk))
+
+
+@receiver(post_save, sender=Property)
+def update_property_search_vector(sender, instance, **kwargs):
+    if connection.vendor == 'postgresql':
+        Property.objects.filter(pk=instance.pk).update_search_vectors()
+
+
+@receiver(post_save, sender=IndiaLocation)
+def update_location_search_vectors(sender, instance, created, **kwargs):
+    # Location names are part of the document of every property in it
+    if not created and connection.vendor == 'postgresql':
+        Property.objects.filter(location=instance).update_search_vectors()
+
+
+@receiver(post_save, sender=Shortlist)
+def increment_shortlist_count(sender, instance, created, **kwargs):
+    # Atomic in-database increment, safe under concurrent shortlisting
+    if created:
+        Property.objects.filter(pk=instance.property_id) \
+            .update(shortlist_count=F('shortlist_count') + 1)
+
+
+@receiver(post_delete, sender=Shortlist)
+def decrement_shortlist_count(sender, instance, **kwargs):
+    Property.objects.filter(pk=instance.property_id, shortlist_count__gt=0) \
+        .update(shortlist_count=F('shortlist_count') - 1)
+
+
+@receiver(pre_save, sender=Property)
+def remember_previous_district(sender, instance, raw=False, **kwargs):
+    """A property moving to another location leaves cached searches of its old district stale too"""
+    instance._previous_district = None
+    if raw or instance.pk is None:
+        return
+    previous = Property.objects.filter(pk=instance.pk) \
+        .values_list('location_id', 'location__state', 'location__district').first()
+    if previous is not None and previous[0] != instance.location_id:
+        instance._previous_district = previous[1:]
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_searches(sender, instance, **kwargs):
+    districts = {(instance.location.state, instance.location.district)}
+    previous = getattr(instance, '_previous_district', None)
+    if previous is not None:
+        districts.add(previous)
+
+    def invalidate():
+        for state, district in districts:
+            search_cache.invalidate_location(state, district)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=IndiaLocation)
+def invalidate_location_searches(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: search_cache.invalidate_location(instance.state, instance.district))
+
+
+@receiver(post_save, sender=Shortlist)
+@receiver(post_delete, sender=Shortlist)
+def invalidate_popularity_searches(sender, instance, **kwargs):
+    # Only the sort_by=popular ordering depends on shortlists
+    transaction.on_commit(search_cache.invalidate_popularity)
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property_for_image(sender, instance, **kwargs):
+    touch_property(instance.property_id)
+
+
+def touch_property(property_id):
+    """
+    Images are part of the property payload, so a change to them counts as a
+    property change; also used where images are written without signals.
+    """
+    Property.objects.filter(pk=property_id).update(updated_at=timezone.now())
+    location = Property.objects.filter(pk=property_id) \
+        .values_list('location__state', 'location__district').first()
+    if location:
+        transaction.on_commit(lambda: search_cache.invalidate_location(*location))
+
+
+@receiver(post_save, sender=IndiaLocation)
+@receiver(post_delete, sender=IndiaLocation)
+def bump_location_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_version(LOCATION_VERSION_KEY))
+
+
+# The User fields serializers.UserSerializer embeds as a property's seller
+SELLER_FIELDS = {'username', 'email', 'phone', 'user_type', 'first_name', 'last_name', 'profile_pic', 'is_verified'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only; they change nothing a property response shows
+    if update_fields is not None and not SELLER_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: bump_version(USER_VERSION_KEY))
@@ -0,0 +1,119 @@
+"""
+In-process spatial index over property coordinates, used for distance
+searches when GeoDjango/PostGIS is not available (SQLite dev and test setups).
+"""
+import threading
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+EARTH_RADIUS_M = 6371008.8
+M_PER_DEGREE_LAT = 111320.0
+# Nearest properties a search considers: their ids become one id__in
+# filter, which must stay well under SQLite's bound-parameter limit
+NEARBY_CANDIDATE_LIMIT = 500
+
+
+class PropertyIndex:
+    """
+    Property coordinates kept in NumPy arrays sorted by latitude. A query
+    binary-searches the latitude band of the search circle, masks the
+    longitude band and runs a vectorized haversine over the survivors only.
+
+    Built lazily from the database on first use and then kept current by the
+    Property save/delete signals of this process. Bulk writes (bulk_create,
+    queryset .update()) and saves in other processes do not reach it, so
+    results can be stale until the index is rebuilt, e.g. on restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._ids = self._lats = self._lngs = None
+
+    @property
+    def is_built(self):
+        return self._built
+
+    def build(self):
+        from .models import Property
+
+        rows = [
+            (pk, point.y, point.x)
+            for pk, point in Property.objects.order_by().values_list('id', 'geo_location').iterator()
+            if point is not None
+        ]
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        lats = np.array([row[1] for row in rows], dtype=np.float64)
+        lngs = np.array([row[2] for row in rows], dtype=np.float64)
+        order = np.argsort(lats, kind='stable')
+        with self._lock:
+            self._ids, self._lats, self._lngs = ids[order], lats[order], lngs[order]
+            self._built = True
+
+    def update(self, pk, latitude, longitude):
+        """Insert or move one property, keeping the latitude order"""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(pk)
+            if latitude is None or longitude is None:
+                return
+            slot = np.searchsorted(self._lats, latitude)
+            self._ids = np.insert(self._ids, slot, pk)
+            self._lats = np.insert(self._lats, slot, latitude)
+            self._lngs = np.insert(self._lngs, slot, longitude)
+
+    def remove(self, pk):
+        with self._lock:
+            if self._built:
+                self._remove(pk)
+
+    def _remove(self, pk):
+        slots = np.flatnonzero(self._ids == pk)
+        if len(slots):
+            self._ids = np.delete(self._ids, slots)
+            self._lats = np.delete(self._lats, slots)
+            self._lngs = np.delete(self._lngs, slots)
+
+    def nearby(self, latitude, longitude, radius_km, limit=None):
+        """
+        (ids, distances in metres) of the properties within `radius_km`,
+        nearest first.
+        """
+        if not self._built:
+            self.build()
+        with self._lock:
+            ids, lats, lngs = self._ids, self._lats, self._lngs
+
+        radius_m = radius_km * 1000.0
+        lat_delta = radius_m / M_PER_DEGREE_LAT
+        lng_delta = lat_delta / max(np.cos(np.radians(latitude)), 0.01)
+
+        start, stop = np.searchsorted(lats, [latitude - lat_delta, latitude + lat_delta], side='left')
+        band = slice(start, stop)
+        in_box = np.abs(lngs[band] - longitude) <= lng_delta
+        candidate_ids = ids[band][in_box]
+        distances = haversine_m(latitude, longitude, lats[band][in_box], lngs[band][in_box])
+
+        within = distances <= radius_m
+        candidate_ids, distances = candidate_ids[within], distances[within]
+        order = np.lexsort((candidate_ids, distances))
+        if limit is not None:
+            order = order[:limit]
+        return candidate_ids[order].tolist(), distances[order].tolist()
+
+
+def haversine_m(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances in metres from one point to arrays of points"""
+    lat1, lng1 = np.radians(latitude), np.radians(longitude)
+    lat2, lng2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+property_index = PropertyIndex() if NUMPY_AVAILABLE else None
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+from core.query_budget import QueryRecorder
+
+
+@override_settings(LOCATION_INDEX_BACKGROUND_RELOAD=False)
+class ConditionalRequestTestCase(TestCase):
+    """A repeated GET with the ETag gets a 304, until the data behind it changes"""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.location = IndiaLocation.objects.create(
+                state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+                pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+            )
+            self.property = Property.objects.create(
+                seller=self.seller, property_type='FLAT', title='Flat', description='2BHK',
+                address='Wagholi', location=self.location, geo_location=Point(73.98, 18.58, srid=4326),
+                price=Decimal('4500000'), area=Decimal('950')
+            )
+        self.client = APIClient()
+
+    def assertNotModified(self, url, **params):
+        etag = self.client.get(url, params)['ETag']
+        with QueryRecorder() as recorder:
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertLessEqual(recorder.count, 1)
+        return etag
+
+    def assertModified(self, url, etag, **params):
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_property_detail(self):
+        url = f'/api/properties/{self.property.id}/'
+        etag = self.assertNotModified(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.images.create(image=f'properties/{self.property.id}/images/front.jpg', is_primary=True)
+        self.assertModified(url, etag)
+
+    def test_seller_profile_change(self):
+        url = f'/api/properties/{self.property.id}/'
+        detail_etag = self.assertNotModified(url)
+        list_etag = self.assertNotModified('/api/properties/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seller.phone = '9000000009'
+            self.seller.save()
+        self.assertModified(url, detail_etag)
+        self.assertModified('/api/properties/', list_etag)
+
+    def test_property_list(self):
+        etag = self.assertNotModified('/api/properties/', location__state='Maharashtra', location__district='Pune')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = 'Renovated flat'
+            self.property.save()
+        self.assertModified('/api/properties/', etag, location__state='Maharashtra', location__district='Pune')
+
+    def test_property_moved_to_another_district(self):
+        params = {'location__state': 'Maharashtra', 'location__district': 'Pune'}
+        etag = self.assertNotModified('/api/properties/', **params)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.location = IndiaLocation.objects.create(
+                state='Maharashtra', district='Mumbai Suburban', sub_district='Andheri', village='Marol',
+                pin_code='400059', centroid=Point(72.88, 19.12, srid=4326), census_code='MHMUMANDMAR'
+            )
+            self.property.save()
+        # Pune searches must drop the property, though it now belongs to Mumbai
+        self.assertModified('/api/properties/', etag, **params)
+
+    def test_location_hierarchy(self):
+        etag = self.assertNotModified('/api/locations/villages/', state='Maharashtra', district='Pune', sub_district='Haveli')
+        with self.captureOnCommitCallbacks(execute=True):
+            IndiaLocation.objects.create(
+                state='Maharashtra', district='Pune', sub_district='Haveli', village='Lonikand',
+                pin_code='412216', centroid=Point(74.02, 18.62, srid=4326), census_code='MHPUNHAVLON'
+            )
+        self.assertModified('/api/locations/villages/', etag, state='Maharashtra', district='Pune', sub_district='Haveli')
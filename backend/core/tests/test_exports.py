@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+
+
+class PropertyExportTestCase(TestCase):
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        for index, property_type in enumerate(['FLAT', 'FLAT', 'PLOT']):
+            Property.objects.create(
+                seller=seller, property_type=property_type, title=f'{property_type} {index}', description='',
+                address='Wagholi', location=location, geo_location=Point(73.98, 18.58 + index / 100, srid=4326),
+                price=Decimal(1000000 * (index + 1)), area=Decimal('950')
+            )
+        self.client = APIClient()
+
+    def export(self, **params):
+        response = self.client.get('/api/properties/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_applies_the_search_filters(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(property_type='FLAT', sort_by='price_low'))))
+        self.assertEqual([row['title'] for row in rows], ['FLAT 0', 'FLAT 1'])
+        self.assertEqual(rows[0]['district'], 'Pune')
+
+    def test_ndjson_fields(self):
+        lines = self.export(output='ndjson', fields='id,price').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(set(json.loads(lines[0])), {'id', 'price'})
+
+    def test_geojson(self):
+        collection = json.loads(self.export(output='geojson', sort_by='oldest'))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        self.assertEqual(len(collection['features']), 3)
+        feature = collection['features'][0]
+        self.assertEqual(feature['geometry']['coordinates'], [73.98, 18.58])
+        self.assertNotIn('latitude', feature['properties'])
+
+    def test_unknown_output(self):
+        response = self.client.get('/api/properties/export/', {'output': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_filter(self):
+        response = self.client.get('/api/properties/export/', {'area__gte': 'large'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.streaming)
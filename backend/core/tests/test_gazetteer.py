@@ -0,0 +1,53 @@
+import gzip
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from core import gazetteer
+from core.models import IndiaLocation
+
+
+class GazetteerPublishTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def publish_village(self, village):
+        IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village=village,
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code=village.upper()
+        )
+        return gazetteer.publish()
+
+    def stored_snapshots(self):
+        return {name for name in default_storage.listdir(gazetteer.SNAPSHOT_DIR)[1] if name.endswith('.json.gz')}
+
+    def test_manifest_points_at_the_snapshots(self):
+        manifest = self.publish_village('Wagholi')
+
+        self.assertEqual(gazetteer.load_manifest(), manifest)
+        snapshot = json.loads(gzip.decompress(gazetteer.open_snapshot(manifest['all']['name'])))
+        self.assertEqual(snapshot['states']['Maharashtra']['Pune']['Haveli'], {'Wagholi': '412207'})
+        self.assertEqual(default_storage.listdir(gazetteer.SNAPSHOT_DIR)[1].count('manifest.json'), 1)
+
+    def test_only_recent_snapshots_are_kept(self):
+        with mock.patch.object(gazetteer, 'KEEP_PUBLISHED', 2):
+            first = self.publish_village('Wagholi')
+            second = self.publish_village('Lonikand')
+            self.assertIn(first['all']['name'], self.stored_snapshots())
+            third = self.publish_village('Kesnand')
+
+        self.assertEqual(self.stored_snapshots(), {
+            second['all']['name'], second['states']['Maharashtra']['name'],
+            third['all']['name'], third['states']['Maharashtra']['name'],
+        })
+        self.assertEqual(gazetteer.load_manifest(), third)
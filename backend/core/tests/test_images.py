@@ -0,0 +1,85 @@
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core import images
+from core.models import IndiaLocation, Property, PropertyImage, User
+from core.serializers import PropertySerializer
+
+EXIF_MODEL = 0x0110
+EXIF_GPS_IFD = 0x8825
+
+
+def jpeg_with_exif():
+    exif = Image.Exif()
+    exif[EXIF_MODEL] = 'Test camera'
+    exif[EXIF_GPS_IFD] = {1: 'N', 2: (18.0, 34.0, 48.0)}
+    buffer = io.BytesIO()
+    Image.new('RGB', (2000, 1000), 'teal').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_PROCESSING_WORKERS=0)
+class ImageProcessingTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.property = Property.objects.create(
+            seller=seller, property_type='FLAT', title='Flat', description='2BHK', address='Wagholi',
+            location=location, geo_location=Point(73.98, 18.58, srid=4326),
+            price=Decimal('4500000'), area=Decimal('950')
+        )
+
+    def add_image(self, data):
+        image = self.property.images.create(image=ContentFile(data, name='photo.jpg'), is_primary=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            images.schedule([image.pk])
+        return PropertyImage.objects.filter(pk=image.pk).first()
+
+    def test_variants_are_created_without_exif(self):
+        image = self.add_image(jpeg_with_exif())
+
+        self.assertEqual(image.status, PropertyImage.READY)
+        self.assertEqual(set(image.variants), {'thumb', 'card', 'full'})
+        self.assertEqual((image.variants['card']['width'], image.variants['card']['height']), (640, 320))
+        with image.image.open() as original, Image.open(original) as decoded:
+            self.assertEqual(dict(decoded.getexif()), {})
+        with image.image.storage.open(image.variants['full']['jpeg']) as variant, Image.open(variant) as decoded:
+            self.assertEqual(dict(decoded.getexif()), {})
+
+    def test_failed_image_is_hidden_until_retried(self):
+        image = self.property.images.create(image=ContentFile(jpeg_with_exif(), name='photo.jpg'))
+
+        def broken_render(data):
+            raise RuntimeError('worker died')
+
+        images.process_or_mark_failed(image.pk, broken_render)
+        image.refresh_from_db()
+        self.assertEqual(image.status, PropertyImage.FAILED)
+        serialized = PropertySerializer(Property.objects.with_details().get(pk=self.property.pk)).data
+        self.assertEqual(serialized['images'], [])
+
+        images.process_or_mark_failed(image.pk, images.image_variants.render_variants)
+        image.refresh_from_db()
+        self.assertEqual(image.status, PropertyImage.READY)
+
+    def test_undecodable_image_is_deleted(self):
+        self.assertIsNone(self.add_image(b'not an image'))
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+
+from core.location_index import LocationIndex
+from core.models import IndiaLocation
+from core.query_budget import QueryRecorder
+
+
+@override_settings(LOCATION_INDEX_BACKGROUND_RELOAD=False)
+class LocationIndexTestCase(TestCase):
+
+    def create_location(self, village, sub_district, pin_code):
+        IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district=sub_district, village=village,
+            pin_code=pin_code, centroid=Point(73.98, 18.58, srid=4326), census_code=village.upper()
+        )
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_location('Wagholi', 'Haveli', '412207')
+            self.create_location('Lonikand', 'Haveli', '412216')
+            self.create_location('Chakan', 'Khed', '410501')
+        self.index = LocationIndex()
+
+    def test_hierarchy(self):
+        self.assertEqual(self.index.children(), ('Maharashtra',))
+        self.assertEqual(self.index.children('Maharashtra'), ('Pune',))
+        self.assertEqual(self.index.children('Maharashtra', 'Pune'), ('Haveli', 'Khed'))
+        self.assertEqual(self.index.children('Maharashtra', 'Pune', 'Haveli'), ('Lonikand', 'Wagholi'))
+        self.assertEqual(self.index.children('Kerala'), ())
+
+    def test_pin_codes(self):
+        self.assertEqual(self.index.pin_codes(), ('410501', '412207', '412216'))
+        self.assertEqual(self.index.pin_codes('Maharashtra', 'Pune', 'Haveli'), ('412207', '412216'))
+        with QueryRecorder() as recorder:
+            self.assertEqual(self.index.pin_codes('Maharashtra', 'Pune', 'Haveli', 'Wagholi'), ('412207',))
+            self.assertEqual(self.index.pin_codes(village='Chakan'), ('410501',))
+        # Village-level and partial filters are not kept in memory
+        self.assertEqual(recorder.count, 2)
+
+    def test_loaded_once_and_refreshed_on_change(self):
+        self.index.children()
+        with QueryRecorder() as recorder:
+            self.index.children('Maharashtra', 'Pune')
+        self.assertEqual(recorder.count, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_location('Rajgurunagar', 'Khed', '410505')
+        self.assertEqual(self.index.children('Maharashtra', 'Pune', 'Khed'), ('Chakan', 'Rajgurunagar'))
+
+    @override_settings(LOCATION_INDEX_BACKGROUND_RELOAD=True)
+    def test_reloads_in_the_background(self):
+        self.index.children()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_location('Rajgurunagar', 'Khed', '410505')
+
+        with mock.patch('core.location_index.threading.Thread') as thread:
+            # The old index is served while the new one loads
+            self.assertEqual(self.index.children('Maharashtra', 'Pune', 'Khed'), ('Chakan',))
+            self.index.children()
+        thread.assert_called_once()
+        # Run the reload here; a thread would not see this test's transaction
+        self.index._load(*thread.call_args.kwargs['args'])
+        self.index._reloading = False
+        self.assertEqual(self.index.children('Maharashtra', 'Pune', 'Khed'), ('Chakan', 'Rajgurunagar'))
@@ -0,0 +1,29 @@
+from django.db import connection
+from django.test import TestCase
+
+from core import location_loader
+from core.models import IndiaLocation
+
+
+class LocationLoaderTestCase(TestCase):
+
+    def load(self, records):
+        rows = []
+        for line_no, record in enumerate(records, 1):
+            rows.append((line_no, *location_loader.normalize_location(record, location_loader.field_lookup(record))))
+        with connection.cursor() as cursor:
+            location_loader.create_staging_table(cursor)
+            location_loader.copy_to_staging(cursor, rows)
+            return location_loader.merge_staging(cursor)
+
+    def test_record_without_census_code(self):
+        # The PIN code directory has no census codes
+        inserted, updated = self.load([{
+            'statename': 'Maharashtra', 'districtname': 'Pune', 'taluk': 'Haveli',
+            'officename': 'Wagholi', 'pincode': '412207', 'latitude': '18.58', 'longitude': '73.98',
+        }])
+
+        self.assertEqual((inserted, updated), (1, []))
+        location = IndiaLocation.objects.get(village='Wagholi')
+        self.assertEqual(location.census_code, '')
+        self.assertEqual(location.pin_code, '412207')
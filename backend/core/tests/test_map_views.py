@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+
+# Pune, Delhi, Chennai
+COORDINATES = [(73.98, 18.58), (77.21, 28.61), (80.27, 13.08)]
+
+
+class MapViewTestCase(TestCase):
+    """Cluster and tile queries at the lowest zooms, where the viewport spans much of the globe"""
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        for i, (longitude, latitude) in enumerate(COORDINATES):
+            Property.objects.create(
+                seller=seller, property_type='FLAT', title=f'Flat {i}', description='', address='',
+                location=location, geo_location=Point(longitude, latitude, srid=4326),
+                price=Decimal('4500000'), area=Decimal('950')
+            )
+        self.client = APIClient()
+
+    def cluster_count(self, bbox, zoom):
+        response = self.client.get('/api/properties/clusters/', {'bbox': bbox, 'zoom': zoom})
+        self.assertEqual(response.status_code, 200, response.content)
+        return sum(cluster['count'] for cluster in response.data['clusters'])
+
+    def test_clusters_at_low_zoom(self):
+        self.assertEqual(self.cluster_count('-180,-85,180,85', 0), 3)
+        self.assertEqual(self.cluster_count('0,0,180,85', 1), 3)
+        self.assertEqual(self.cluster_count('-180,-85,0,0', 1), 0)
+        self.assertEqual(self.cluster_count('45,0,90,40', 2), 3)
+
+    def test_clusters_reject_malformed_filters(self):
+        response = self.client.get('/api/properties/clusters/', {'bbox': '-180,-85,180,85', 'zoom': 0, 'area__lte': 'big'})
+        self.assertEqual(response.status_code, 400)
+
+    def tile(self, z, x, y):
+        response = self.client.get(f'/api/properties/tiles/{z}/{x}/{y}.mvt')
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_tiles_at_low_zoom(self):
+        self.assertTrue(self.tile(0, 0, 0))
+        # India lies in the north-east quadrant
+        self.assertTrue(self.tile(1, 1, 0))
+        self.assertFalse(self.tile(1, 0, 1))
+        self.assertTrue(self.tile(2, 2, 1))
+        self.assertFalse(self.tile(2, 0, 0))
+
+    def test_tiles_reject_malformed_filters(self):
+        response = self.client.get('/api/properties/tiles/0/0/0.mvt', {'price__lte': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_the_current_version_is_immutable(self):
+        url = '/api/properties/tiles/0/0/0.mvt'
+        version = self.client.get(url)['X-Tile-Version']
+        self.assertIn('immutable', self.client.get(url, {'v': version})['Cache-Control'])
+        self.assertNotIn('immutable', self.client.get(url, {'v': '1'})['Cache-Control'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Property.objects.update(price=Decimal('5000000'))
+            Property.objects.first().save()
+        self.assertNotIn('immutable', self.client.get(url, {'v': version})['Cache-Control'])
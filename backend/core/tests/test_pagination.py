@@ -0,0 +1,51 @@
+import json
+from base64 import b64encode
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+
+
+def cursor(position):
+    return b64encode(json.dumps(position).encode('utf-8'), altchars=b'-_').decode('ascii')
+
+
+class KeysetCursorPaginationTestCase(TestCase):
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        for i in range(3):
+            Property.objects.create(
+                seller=seller, property_type='FLAT', title=f'Flat {i}', description='2BHK', address='Wagholi',
+                location=location, geo_location=Point(73.98, 18.58, srid=4326),
+                price=Decimal('4500000') + i, area=Decimal('950')
+            )
+        self.client = APIClient()
+
+    def test_next_link(self):
+        response = self.client.get('/api/properties/', {'sort_by': 'price_low', 'page_size': 2})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Flat 0', 'Flat 1'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.data['results']], ['Flat 2'])
+
+    def test_forged_cursor(self):
+        positions = {
+            'price_low': [['x', 1], [None, 1], [['4500000'], 1], ['4500000', 'one']],
+            'newest': [['yesterday', 1], [1.5, 1]],
+        }
+        for sort_by, forged in positions.items():
+            for position in forged:
+                with self.subTest(sort_by=sort_by, position=position):
+                    response = self.client.get('/api/properties/', {'sort_by': sort_by, 'cursor': cursor(position)})
+                    self.assertEqual(response.status_code, 404)
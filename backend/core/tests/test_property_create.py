@@ -0,0 +1,49 @@
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+
+
+class PropertyCreateTestCase(TestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        self.wagholi = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.lonikand = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Lonikand',
+            pin_code='412216', centroid=Point(74.02, 18.62, srid=4326), census_code='MHPUNHAVLON'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def create(self, **fields):
+        data = dict({
+            'property_type': 'FLAT', 'title': 'Flat', 'description': '2BHK', 'address': 'Wagholi',
+            'price': '4500000', 'area': '950',
+        }, **fields)
+        return self.client.post('/api/properties/', data, format='json')
+
+    def test_named_location_without_pin_code_is_kept(self):
+        # The pin sits right on Lonikand's centroid, but the seller named Wagholi
+        response = self.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            latitude=18.62, longitude=74.02
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Property.objects.get().location, self.wagholi)
+
+    def test_coordinates_fill_in_a_missing_location(self):
+        response = self.create(latitude=18.62, longitude=74.02)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Property.objects.get().location, self.lonikand)
+
+    def test_new_location_needs_a_pin_code(self):
+        response = self.create(state='Maharashtra', district='Pune', sub_district='Haveli', village='Kesnand')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pin_code', response.data)
@@ -0,0 +1,50 @@
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+
+from core.models import IndiaLocation, Property, User
+from core.property_import import import_properties
+from core.query_budget import QueryRecorder
+
+
+class PropertyImportTestCase(TestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='builder', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        self.location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+
+    def row(self, **overrides):
+        return dict({
+            'property_type': 'FLAT', 'title': 'Flat', 'description': '2BHK', 'address': 'Wagholi',
+            'state': 'Maharashtra', 'district': 'Pune', 'sub_district': 'Haveli', 'village': 'Wagholi',
+            'price': '4500000', 'area': '950', 'latitude': '', 'longitude': '',
+        }, **overrides)
+
+    def test_report(self):
+        records = enumerate([
+            self.row(),
+            self.row(village='Nowhere'),
+            self.row(price='cheap'),
+            self.row(title='Pinned flat', latitude='18.59', longitude='73.99'),
+        ], 1)
+        report = import_properties(self.seller, records)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(sorted(error['row'] for error in report['errors']), [2, 3])
+        self.assertIn('location', next(e['errors'] for e in report['errors'] if e['row'] == 2))
+        self.assertIn('price', next(e['errors'] for e in report['errors'] if e['row'] == 3))
+        # Without coordinates a listing is placed at its village
+        self.assertEqual(Property.objects.get(title='Flat').geo_location.coords, (73.98, 18.58))
+        self.assertEqual(Property.objects.get(title='Pinned flat').geo_location.coords, (73.99, 18.59))
+
+    def test_queries_per_chunk_do_not_grow_with_rows(self):
+        def count(rows):
+            with QueryRecorder() as recorder:
+                import_properties(self.seller, enumerate([self.row() for _ in range(rows)], 1))
+            return recorder.count
+
+        self.assertEqual(count(5), count(50))
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, Shortlist, User
+from core.query_budget import QueryRecorder
+from core.views import LocationViewSet, PropertyViewSet
+
+
+@override_settings(LOCATION_INDEX_BACKGROUND_RELOAD=False)
+class QueryBudgetTestCase(TestCase):
+    """
+    Every endpoint must stay within the budget its viewset declares, and the
+    number of queries must not grow with the number of rows returned.
+    """
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer', password='secret123', phone='9000000002', user_type='BUYER'
+        )
+        self.location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.buyer).key}')
+
+    def create_properties(self, count, shortlist=True):
+        for i in range(count):
+            prop = Property.objects.create(
+                seller=self.seller, property_type='FLAT', title=f'Flat {i}',
+                description='2BHK', address='Wagholi', location=self.location,
+                geo_location=Point(73.98 + i * 0.001, 18.58, srid=4326),
+                price=Decimal('4500000') + i, area=Decimal('950')
+            )
+            prop.images.create(image=f'properties/{prop.id}/images/front.jpg', is_primary=True)
+            if shortlist:
+                Shortlist.objects.create(buyer=self.buyer, property=prop)
+
+    def count_queries(self, url, **params):
+        with QueryRecorder() as recorder:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return recorder.count
+
+    def assertWithinBudget(self, viewset, action, url, **params):
+        budget = viewset.query_budgets[action]
+        self.create_properties(2)
+        small = self.count_queries(url, **params)
+        self.create_properties(15)
+        large = self.count_queries(url, **params)
+        self.assertLessEqual(large, budget, f'{viewset.__name__}.{action} is over its query budget')
+        self.assertEqual(small, large, f'{viewset.__name__}.{action} issues queries per row')
+
+    def test_property_list(self):
+        self.assertWithinBudget(PropertyViewSet, 'list', '/api/properties/', page_size=50)
+
+    def test_property_list_with_distance(self):
+        self.assertWithinBudget(
+            PropertyViewSet, 'list', '/api/properties/',
+            user_latitude='18.58', user_longitude='73.98', max_distance='50'
+        )
+
+    def test_property_retrieve(self):
+        self.create_properties(1)
+        prop = Property.objects.first()
+        queries = self.count_queries(f'/api/properties/{prop.id}/')
+        self.assertLessEqual(queries, PropertyViewSet.query_budgets['retrieve'])
+
+    def test_my_properties(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.seller).key}')
+        self.assertWithinBudget(PropertyViewSet, 'my_properties', '/api/properties/my_properties/')
+
+    def test_shortlisted(self):
+        self.assertWithinBudget(PropertyViewSet, 'shortlisted', '/api/properties/shortlisted/')
+
+    def test_location_hierarchy(self):
+        params = {
+            'states': {},
+            'districts': {'state': 'Maharashtra'},
+            'sub_districts': {'state': 'Maharashtra', 'district': 'Pune'},
+            'villages': {'state': 'Maharashtra', 'district': 'Pune', 'sub_district': 'Haveli'},
+            'pin_codes': {'state': 'Maharashtra'},
+        }
+        for action, query in params.items():
+            with self.subTest(action=action):
+                queries = self.count_queries(f'/api/locations/{action}/', **query)
+                self.assertLessEqual(queries, LocationViewSet.query_budgets[action])
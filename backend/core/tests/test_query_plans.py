@@ -0,0 +1,144 @@
+import os
+import random
+import unittest
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase, tag
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import IndiaLocation, Property, User
+from core.pagination import KeysetCursorPagination
+from core.views import PropertyViewSet
+
+PROPERTY_COUNT = 50000
+STATE_COUNT = 20
+DISTRICTS_PER_STATE = 10
+VILLAGES_PER_DISTRICT = 10
+
+
+@tag('plans')
+@unittest.skipUnless(os.environ.get('RUN_PLAN_TESTS'), 'set RUN_PLAN_TESTS=1 to run the query plan tests')
+class QueryPlanTestCase(TestCase):
+    """
+    The main search shapes must be answered from an index on a realistically
+    sized table. Guards against a query or model change quietly bringing
+    back sequential scans over core_property.
+
+    Seeding the table takes a while, so these only run when asked for:
+    RUN_PLAN_TESTS=1 python manage.py test --tag plans
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = random.Random(2011)
+        sellers = User.objects.bulk_create([
+            User(username=f'seller{i}', phone=f'90000{i:05d}', user_type='SELLER') for i in range(100)
+        ])
+        locations = IndiaLocation.objects.bulk_create([
+            IndiaLocation(
+                state=f'State {s}', district=f'District {s}-{d}', sub_district=f'Taluk {s}-{d}',
+                village=f'Village {s}-{d}-{v}', pin_code=f'{400000 + s * 1000 + d * 10 + v}',
+                centroid=Point(70 + s + v * 0.01, 10 + d + v * 0.01, srid=4326),
+                census_code=f'C{s:02d}{d:02d}{v:02d}'
+            )
+            for s in range(STATE_COUNT) for d in range(DISTRICTS_PER_STATE) for v in range(VILLAGES_PER_DISTRICT)
+        ])
+        cls.seller = sellers[0]
+
+        now = timezone.now()
+        types = [choice for choice, _ in Property.PROPERTY_TYPES]
+        words = ['spacious', 'corner', 'garden', 'lake', 'highway', 'metro', 'farm', 'villa', 'duplex', 'terrace']
+        properties = []
+        for i in range(PROPERTY_COUNT):
+            location = generator.choice(locations)
+            properties.append(Property(
+                seller=generator.choice(sellers), property_type=generator.choice(types),
+                title=f'{generator.choice(words)} {generator.choice(words)} {i}',
+                description=' '.join(generator.choice(words) for _ in range(12)), address=location.village,
+                location=location,
+                geo_location=Point(location.centroid.x + generator.uniform(-0.05, 0.05),
+                                   location.centroid.y + generator.uniform(-0.05, 0.05), srid=4326),
+                price=Decimal(generator.randrange(100000, 50000000)), area=Decimal(generator.randrange(100, 20000)),
+                shortlist_count=generator.randrange(0, 50),
+            ))
+        Property.objects.bulk_create(properties, batch_size=5000)
+        # auto_now_add ignores explicit values, so spread the dates afterwards
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Property._meta.db_table} SET created_at = %s - id * interval %s',
+                [now, '1 minute']
+            )
+        Property.objects.update_search_vectors()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def search_plan(self, position=None, **params):
+        """EXPLAIN of a page of a /api/properties/ search; the first unless a cursor `position` is given"""
+        request = Request(APIRequestFactory().get('/api/properties/', params))
+        request.user = self.seller
+        view = PropertyViewSet(request=request, action='list', format_kwarg=None)
+        queryset = view.sort_properties(view.filter_properties(Property.objects.all()))
+        paginator = KeysetCursorPagination()
+        paginator.ordering = paginator.get_ordering(queryset)
+        queryset = queryset.order_by(*paginator.ordering)
+        if position is not None:
+            queryset = queryset.filter(paginator.get_keyset_filter(position))
+        return queryset[:KeysetCursorPagination.page_size + 1].explain()
+
+    def assertIndexScan(self, plan, index=None):
+        self.assertNotIn(f'Seq Scan on {Property._meta.db_table}', plan, plan)
+        self.assertRegex(plan, r'Index (Only )?Scan|Bitmap Index Scan', plan)
+        if index:
+            self.assertIn(index, plan)
+
+    def test_newest_first(self):
+        self.assertIndexScan(self.search_plan(), 'property_created')
+
+    def test_deep_cursor_page(self):
+        # A page far down the list starts its index scan at the cursor
+        row = Property.objects.order_by('-created_at', '-id').values('created_at', 'id')[PROPERTY_COUNT // 2]
+        plan = self.search_plan(position=[row['created_at'].isoformat(), row['id']])
+        self.assertIndexScan(plan, 'property_created')
+        self.assertRegex(plan, r'Index Cond: \(.*created_at <=', plan)
+
+    def test_deep_cursor_page_by_price(self):
+        row = Property.objects.order_by('price', 'id').values('price', 'id')[PROPERTY_COUNT // 2]
+        plan = self.search_plan(position=[str(row['price']), row['id']], sort_by='price_low')
+        self.assertIndexScan(plan, 'property_price')
+        self.assertRegex(plan, r'Index Cond: \(.*price >=', plan)
+
+    def test_property_type(self):
+        self.assertIndexScan(self.search_plan(property_type='FLAT'), 'property_type_created')
+
+    def test_property_type_by_price(self):
+        plan = self.search_plan(property_type='HOUSE', sort_by='price_low', price__gte='1000000', price__lte='2000000')
+        self.assertIndexScan(plan, 'property_type_price')
+
+    def test_area_range(self):
+        self.assertIndexScan(self.search_plan(area__gte='500', area__lte='800', sort_by='area_high'), 'property_area')
+
+    def test_popular(self):
+        self.assertIndexScan(self.search_plan(sort_by='popular'), 'property_popularity')
+
+    def test_location(self):
+        plan = self.search_plan(location__state='State 3', location__district='District 3-4')
+        self.assertIndexScan(plan)
+        self.assertNotIn(f'Seq Scan on {IndiaLocation._meta.db_table}', plan, plan)
+
+    def test_my_properties(self):
+        self.assertIndexScan(self.search_plan(my_properties='true'), 'property_seller_created')
+
+    def test_keywords(self):
+        self.assertIndexScan(self.search_plan(q='lake villa'), 'property_search_vector_gin')
+
+    def test_distance(self):
+        self.assertIndexScan(self.search_plan(user_latitude='14.5', user_longitude='75.5', max_distance='5'))
+
+    def test_location_hierarchy_prefixes(self):
+        locations = IndiaLocation.objects.filter(state='State 7', district='District 7-2')
+        plan = locations.values_list('sub_district', flat=True).distinct().explain()
+        self.assertNotIn(f'Seq Scan on {IndiaLocation._meta.db_table}', plan, plan)
@@ -0,0 +1,27 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class SearchParamsTestCase(TestCase):
+    """Malformed search filters are rejected with a 400 by every search-shaped action"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_facets(self):
+        for name in ('price__gte', 'price__lte', 'area__gte', 'area__lte'):
+            response = self.client.get('/api/properties/facets/', {name: 'abc'})
+            self.assertEqual(response.status_code, 400, name)
+
+    def test_list(self):
+        self.assertEqual(self.client.get('/api/properties/', {'price__gte': 'NaN'}).status_code, 400)
+
+    def test_neutral_values_are_ignored(self):
+        response = self.client.get('/api/properties/facets/', {'price__gte': '0', 'price__lte': '10000000'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_max_distance(self):
+        params = {'user_latitude': '18.58', 'user_longitude': '73.98'}
+        for value in ('far', '-5', '0', 'inf'):
+            response = self.client.get('/api/properties/', dict(params, max_distance=value))
+            self.assertEqual(response.status_code, 400, value)
@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+
+from core.models import IndiaLocation, Property, Shortlist, User
+
+
+class ShortlistCountTestCase(TestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer', password='secret123', phone='9000000002', user_type='BUYER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.property = Property.objects.create(
+            seller=self.seller, property_type='FLAT', title='Flat', description='2BHK', address='Wagholi',
+            location=location, geo_location=Point(73.98, 18.58, srid=4326),
+            price=Decimal('4500000'), area=Decimal('950')
+        )
+
+    def test_saving_a_stale_instance_keeps_the_count(self):
+        stale = Property.objects.get(pk=self.property.pk)
+        Shortlist.objects.create(buyer=self.buyer, property=self.property)
+
+        stale.title = 'Renovated flat'
+        stale.save()
+
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.title, 'Renovated flat')
+        self.assertEqual(self.property.shortlist_count, 1)
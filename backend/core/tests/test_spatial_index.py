@@ -0,0 +1,59 @@
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import IndiaLocation, Property, User
+from core.query_budget import QueryRecorder
+from core.spatial_index import property_index
+
+
+@unittest.skipIf(property_index is None, 'NumPy is not installed')
+@mock.patch('core.views.GIS_AVAILABLE', False)
+class SpatialIndexFallbackTestCase(TestCase):
+    """Distance searches answered by the in-process index when PostGIS is unavailable"""
+
+    def setUp(self):
+        seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        # The nearest listings are open plots; flats only come further out
+        for i in range(30):
+            Property.objects.create(
+                seller=seller, property_type='OPEN_PLOT' if i < 20 else 'FLAT', title=f'Listing {i}',
+                description='', address='Wagholi', location=location,
+                geo_location=Point(73.98 + i * 0.001, 18.58, srid=4326),
+                price=Decimal('4500000'), area=Decimal('950')
+            )
+        property_index.build()
+        self.client = APIClient()
+
+    def search(self, **params):
+        params = dict({'user_latitude': '18.58', 'user_longitude': '73.98', 'max_distance': '50', 'page_size': 4}, **params)
+        titles, url = [], '/api/properties/'
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200, response.content)
+            titles += [item['title'] for item in response.data['results']]
+            url, params = response.data['next'], None
+        return titles
+
+    def test_filters_apply_to_every_property_in_range(self):
+        self.assertEqual(self.search(property_type='FLAT'), [f'Listing {i}' for i in range(20, 30)])
+
+    def test_pages_nearest_first(self):
+        with QueryRecorder() as recorder:
+            titles = self.search()
+        self.assertEqual(titles, [f'Listing {i}' for i in range(30)])
+        self.assertFalse(any('CASE' in sql for sql, _ in recorder.queries))
+
+    def test_only_the_nearest_candidates_are_considered(self):
+        with mock.patch('core.views.NEARBY_CANDIDATE_LIMIT', 25):
+            self.assertEqual(self.search(), [f'Listing {i}' for i in range(25)])
@@ -0,0 +1,139 @@
+import io
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core import uploads
+from core.models import ImageUpload, IndiaLocation, Property, PropertyImage, User
+
+
+def png(color='teal'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_PROCESSING_WORKERS=0)
+class ResumableUploadTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, CHUNKED_UPLOAD_DIR=os.path.join(media_root, 'partial'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.property = Property.objects.create(
+            seller=self.seller, property_type='FLAT', title='Flat', description='2BHK', address='Wagholi',
+            location=location, geo_location=Point(73.98, 18.58, srid=4326),
+            price=Decimal('4500000'), area=Decimal('950')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+        self.base = f'/api/properties/{self.property.id}/uploads/'
+
+    def start(self, filename='photo.png', size=10):
+        return self.client.post(self.base, {'filename': filename, 'size': size}, format='json')
+
+    def send(self, upload_id, offset, data):
+        return self.client.patch(
+            f'{self.base}{upload_id}', data, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def finalize(self, upload_ids):
+        return self.client.post(f'{self.base}finalize', {'uploads': upload_ids}, format='json')
+
+    def uploaded(self, data, filename='photo.png'):
+        upload_id = self.start(filename, len(data)).data['id']
+        middle = len(data) // 2
+        self.assertEqual(self.send(upload_id, 0, data[:middle]).status_code, 200)
+        response = self.send(upload_id, middle, data[middle:])
+        self.assertTrue(response.data['complete'])
+        return upload_id
+
+    def test_start(self):
+        response = self.start(size=1234)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['offset'], response.data['complete']), (0, False))
+        self.assertTrue(os.path.exists(uploads.part_path(ImageUpload.objects.get())))
+
+        self.assertEqual(self.start(filename='notes.txt').status_code, 400)
+        self.assertEqual(self.start(size=uploads.MAX_FILE_SIZE + 1).status_code, 400)
+
+    def test_offset_mismatch_is_a_conflict(self):
+        upload_id = self.start().data['id']
+        self.assertEqual(self.send(upload_id, 0, b'12345').data['offset'], 5)
+
+        response = self.send(upload_id, 3, b'45678')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 5)
+        self.assertEqual(self.client.get(f'{self.base}{upload_id}').data['offset'], 5)
+
+    def test_retried_chunk_replaces_leftover_bytes(self):
+        upload_id = self.start().data['id']
+        self.send(upload_id, 0, b'12345')
+        upload = ImageUpload.objects.get()
+        # A copy interrupted after writing part of the next chunk
+        with open(uploads.part_path(upload), 'ab') as part:
+            part.write(b'xyz')
+
+        self.assertEqual(self.send(upload_id, 5, b'67890').status_code, 200)
+        with open(uploads.part_path(upload), 'rb') as part:
+            self.assertEqual(part.read(), b'1234567890')
+
+    def test_short_chunk_is_discarded(self):
+        upload_id = self.start().data['id']
+        with self.assertRaises(uploads.UploadError):
+            uploads.append(upload_id, self.seller, self.property.id, 0, 10, io.BytesIO(b'12345'))
+
+        self.assertEqual(ImageUpload.objects.get().received, 0)
+        self.assertEqual(os.listdir(uploads.get_upload_dir()), [f'{upload_id}.part'])
+
+    def test_finalize_keeps_the_given_order(self):
+        first, second = self.uploaded(png('red')), self.uploaded(png('blue'))
+
+        response = self.finalize([second, first])
+        self.assertEqual(response.status_code, 201)
+        images = [PropertyImage.objects.get(id=image_id) for image_id in response.data['images']]
+        self.assertEqual([image.is_primary for image in images], [True, False])
+        with images[0].image.open() as original, Image.open(original) as decoded:
+            self.assertEqual(decoded.getpixel((0, 0)), (0, 0, 255))
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_image_limit(self):
+        upload_id = self.uploaded(png())
+        with mock.patch.object(uploads, 'MAX_IMAGES_PER_PROPERTY', 0):
+            response = self.finalize([upload_id])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PropertyImage.objects.exists())
+        self.assertTrue(ImageUpload.objects.filter(id=upload_id).exists())
+
+    def test_non_image_is_rejected(self):
+        upload_id = self.uploaded(b'not a png at all')
+
+        response = self.finalize([upload_id])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PropertyImage.objects.exists())
+        self.assertEqual(os.listdir(uploads.get_upload_dir()), [f'{upload_id}.part'])
+
+    def test_duplicate_finalize(self):
+        upload_id = self.uploaded(png())
+        self.assertEqual(self.finalize([upload_id]).status_code, 201)
+
+        response = self.finalize([upload_id])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PropertyImage.objects.count(), 1)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import view_tracking
+from core.models import IndiaLocation, Property, PropertyView, PropertyViewDaily, User
+from core.query_budget import QueryRecorder
+
+
+# The background flusher would write on its own connection; the tests flush explicitly
+@mock.patch('core.view_tracking.start_flusher')
+class ViewTrackingTestCase(TestCase):
+
+    def setUp(self):
+        view_tracking.flush()
+        self.seller = User.objects.create_user(
+            username='seller', password='secret123', phone='9000000001', user_type='SELLER'
+        )
+        location = IndiaLocation.objects.create(
+            state='Maharashtra', district='Pune', sub_district='Haveli', village='Wagholi',
+            pin_code='412207', centroid=Point(73.98, 18.58, srid=4326), census_code='MHPUNHAVWAG'
+        )
+        self.property = Property.objects.create(
+            seller=self.seller, property_type='FLAT', title='Flat', description='2BHK',
+            address='Wagholi', location=location, geo_location=Point(73.98, 18.58, srid=4326),
+            price=Decimal('4500000'), area=Decimal('950')
+        )
+        self.client = APIClient()
+
+    def test_detail_view_does_not_write(self, start_flusher):
+        with QueryRecorder() as recorder:
+            self.client.get(f'/api/properties/{self.property.id}/')
+        self.assertFalse(any(sql.lstrip().upper().startswith('INSERT') for sql, _ in recorder.queries))
+        self.assertEqual(view_tracking.pending(), 1)
+        self.assertFalse(PropertyView.objects.exists())
+
+    def test_revalidated_view_is_counted(self, start_flusher):
+        url = f'/api/properties/{self.property.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(view_tracking.pending(), 2)
+
+    def test_flush_writes_events_and_rollups_in_batches(self, start_flusher):
+        for _ in range(50):
+            view_tracking.record(self.property.id)
+        view_tracking.record(self.property.id + 1000)  # deleted since; dropped
+
+        with QueryRecorder() as recorder:
+            self.assertEqual(view_tracking.flush(), 50)
+        self.assertLessEqual(recorder.count, 5)
+        self.assertEqual(PropertyView.objects.count(), 50)
+
+        view_tracking.record(self.property.id)
+        view_tracking.flush()
+        rollup = PropertyViewDaily.objects.get(property=self.property)
+        self.assertEqual((rollup.date, rollup.views), (timezone.localdate(), 51))
+
+    def test_seller_stats(self, start_flusher):
+        PropertyViewDaily.objects.add({
+            (self.property.id, timezone.localdate()): 7,
+            (self.property.id, timezone.localdate() - timedelta(days=60)): 3,
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.seller).key}')
+        response = self.client.get('/api/properties/view-stats/', {'days': 30})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 7)
+        self.assertEqual(response.data['properties'], [{'id': self.property.id, 'title': 'Flat', 'views': 7}])
@@ -0,0 +1,183 @@
+"""
+Resumable chunked image uploads.
+
+An upload is started with its file name and total size, then its bytes are
+appended in order, each chunk stating the offset it starts at. A chunk is
+streamed from the request to local disk in small blocks, so a worker never
+holds a whole photo in memory, and appended to the upload's part file; a
+client whose connection drops asks for the current offset and carries on
+from there. Finished uploads are checked to decode as images, moved into
+media storage and attached in one INSERT.
+"""
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from . import images
+from .models import ImageUpload, Property, PropertyImage, property_image_upload_path
+from .signals import touch_property
+
+BLOCK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_FILE_SIZE = 25 * 1024 * 1024
+MAX_IMAGES_PER_PROPERTY = 30
+# Formats Pillow can decode, so core.images can re-encode them without metadata
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+class UploadError(Exception):
+    """Raised with a message for the client; `offset` is set when the client is out of step"""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+def get_upload_dir():
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.MEDIA_ROOT, 'uploads', 'partial'))
+
+
+def part_path(upload):
+    return os.path.join(get_upload_dir(), f'{upload.id}.part')
+
+
+def start(owner, property, filename, size):
+    filename = os.path.basename(filename or '')
+    if not filename.lower().endswith(IMAGE_EXTENSIONS):
+        raise UploadError(f"Unsupported file type. Allowed: {', '.join(IMAGE_EXTENSIONS)}")
+    if not 0 < size <= MAX_FILE_SIZE:
+        raise UploadError(f'File size must be between 1 byte and {MAX_FILE_SIZE} bytes')
+
+    upload = ImageUpload.objects.create(owner=owner, property=property, filename=filename, size=size)
+    os.makedirs(get_upload_dir(), exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def append(upload_id, owner, property_id, offset, length, stream):
+    """
+    Append `length` bytes read from `stream` at `offset`. Returns the updated
+    upload.
+
+    The body is first streamed from the client to a chunk file of its own,
+    with no transaction open, however slow the connection. Only then is the
+    upload row locked, the offset checked again and the chunk copied onto
+    the part file from local disk, so a retried chunk racing its original
+    cannot write twice and the lock is held for a disk copy, not a network
+    read.
+    """
+    if not 0 < length <= MAX_CHUNK_SIZE:
+        raise UploadError(f'Chunks must be between 1 byte and {MAX_CHUNK_SIZE} bytes')
+
+    upload = ImageUpload.objects.filter(id=upload_id, owner=owner, property_id=property_id).first()
+    if upload is None:
+        return None
+    # Turn away a client that is out of step before reading its body
+    check_offset(upload, offset, length)
+
+    chunk = tempfile.NamedTemporaryFile(dir=get_upload_dir(), prefix=f'{upload.id}.', suffix='.chunk', delete=False)
+    try:
+        with chunk:
+            written = 0
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                chunk.write(block)
+                written += len(block)
+        if written != length:
+            raise UploadError('Chunk ended early', offset=upload.received)
+
+        with transaction.atomic():
+            upload = ImageUpload.objects.select_for_update().filter(id=upload.id).first()
+            if upload is None:
+                return None
+            check_offset(upload, offset, length)
+            with open(chunk.name, 'rb') as source, open(part_path(upload), 'r+b') as part:
+                # Drop anything a previous, interrupted chunk left past the offset
+                part.truncate(offset)
+                part.seek(offset)
+                shutil.copyfileobj(source, part, BLOCK_SIZE)
+            upload.received = offset + length
+            upload.save(update_fields=['received'])
+    finally:
+        os.remove(chunk.name)
+    return upload
+
+
+def check_offset(upload, offset, length):
+    if offset != upload.received:
+        raise UploadError('Offset does not match the bytes received so far', offset=upload.received)
+    if offset + length > upload.size:
+        raise UploadError('Chunk runs past the declared file size', offset=upload.received)
+
+
+def finish(owner, property, upload_ids):
+    """
+    Move finished uploads into storage and attach them to the property in
+    one INSERT, in the order given. Returns the new PropertyImage ids.
+
+    The property and upload rows stay locked until the images are attached,
+    so a retried or concurrent call waits and then finds the uploads gone
+    instead of attaching them twice or overrunning the image limit.
+    """
+    upload_ids = [str(upload_id) for upload_id in upload_ids]
+    storage = PropertyImage._meta.get_field('image').storage
+    names = []
+    try:
+        with transaction.atomic():
+            Property.objects.select_for_update().filter(id=property.id).first()
+            uploads = {
+                str(upload.id): upload
+                for upload in ImageUpload.objects.select_for_update().filter(id__in=upload_ids, owner=owner, property=property)
+            }
+            missing = [upload_id for upload_id in upload_ids if upload_id not in uploads]
+            if missing:
+                raise UploadError(f"Unknown uploads: {', '.join(missing)}")
+            ordered = [uploads[upload_id] for upload_id in upload_ids]
+            incomplete = [str(upload.id) for upload in ordered if not upload.is_complete]
+            if incomplete:
+                raise UploadError(f"Uploads not complete: {', '.join(incomplete)}")
+            if property.images.count() + len(ordered) > MAX_IMAGES_PER_PROPERTY:
+                raise UploadError(f'A property can have at most {MAX_IMAGES_PER_PROPERTY} images')
+
+            for upload in ordered:
+                with open(part_path(upload), 'rb') as part:
+                    verify_image(upload, part)
+                    part.seek(0)
+                    name = property_image_upload_path(PropertyImage(property=property), upload.filename)
+                    names.append(storage.save(name, File(part)))
+
+            image_ids = PropertyImage.objects.attach(property.id, names)
+            ImageUpload.objects.filter(id__in=[upload.id for upload in ordered]).delete()
+            # The INSERT bypasses the PropertyImage signals
+            touch_property(property.id)
+            images.schedule(image_ids)
+            transaction.on_commit(lambda: [discard_part(upload) for upload in ordered])
+    except Exception:
+        # Nothing was attached; do not leave the copies behind in storage
+        for name in names:
+            storage.delete(name)
+        raise
+    return image_ids
+
+
+def verify_image(upload, part):
+    """Raise UploadError unless the bytes are an image Pillow can decode"""
+    try:
+        with Image.open(part) as image:
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise UploadError(f'{upload.filename} is not a valid image')
+
+
+def discard_part(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
@@ -1,4 +1,5 @@
 from django.urls import path, include
+from rest_framework.permissions import AllowAny
 from rest_framework.routers import DefaultRouter
 from .views import (
     PropertyViewSet, LocationViewSet, UserRegisterView, 
@@ -12,6 +13,16 @@ router.register(r'locations', LocationViewSet, basename='location')
 router.register(r'shortlist', ShortlistViewSet, basename='shortlist')
 
 urlpatterns = [
+    path(
+        'properties/tiles/<int:z>/<int:x>/<int:y>.mvt',
+        PropertyViewSet.as_view({'get': 'tiles'}),
+        name='property-tiles'
+    ),
+    path(
+        'locations/snapshots/<str:name>',
+        LocationViewSet.as_view({'get': 'snapshot_file'}, permission_classes=[AllowAny]),
+        name='location-snapshot-file'
+    ),
     path('', include(router.urls)),
     path('test/', TestView.as_view(), name='test'),
     path('api/auth/register/', UserRegisterView.as_view(), name='register'),
@@ -0,0 +1,28 @@
+"""
+Version stamps kept in the default cache. Anything derived from a data set
+(cached results, ETags, in-memory indexes) embeds the stamp and is dropped
+or recomputed when the stamp is bumped.
+"""
+import time
+
+from django.core.cache import cache
+
+LOCATION_VERSION_KEY = 'data-version:locations'
+# Seller details embedded in property responses
+USER_VERSION_KEY = 'data-version:users'
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed with the clock so a version evicted from the cache never repeats
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
@@ -0,0 +1,124 @@
+"""
+Write-behind recording of property detail views.
+
+A detail request only appends (property, user, time) to an in-process
+buffer; nothing touches the database on the request path. A background
+thread flushes the buffer every VIEW_FLUSH_INTERVAL seconds (sooner once
+VIEW_FLUSH_BATCH events are waiting): the raw events go into PropertyView
+with one bulk INSERT, and the per-property, per-day counts are added to
+PropertyViewDaily with one upsert. Seller statistics read only the rollups.
+
+Each process keeps its own buffer; the rollup upsert adds to the stored
+counts, so flushes from several workers combine. Views buffered in a
+process that is killed outright are lost, which is acceptable for
+analytics. VIEW_FLUSH_INTERVAL = 0 flushes on every view instead, for
+single-process development servers.
+"""
+import atexit
+import threading
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+# The oldest events are dropped beyond this, should the database be unavailable for a long time
+MAX_BUFFERED_VIEWS = 100000
+
+_lock = threading.Lock()
+_buffer = deque(maxlen=MAX_BUFFERED_VIEWS)
+_wake = threading.Event()
+_flusher = None
+
+
+def get_flush_interval():
+    return getattr(settings, 'VIEW_FLUSH_INTERVAL', 10)
+
+
+def get_flush_batch():
+    return getattr(settings, 'VIEW_FLUSH_BATCH', 1000)
+
+
+def record(property_id, user_id=None):
+    """Note a view of a property; returns immediately without a query"""
+    with _lock:
+        _buffer.append((property_id, user_id, timezone.now()))
+        waiting = len(_buffer)
+
+    if get_flush_interval() == 0:
+        try:
+            flush()
+        except Exception as e:
+            print(f"Flushing property views failed: {e}")
+        return
+    start_flusher()
+    if waiting >= get_flush_batch():
+        _wake.set()
+
+
+def pending():
+    with _lock:
+        return len(_buffer)
+
+
+def start_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=run_flusher, name='view-flush', daemon=True)
+            _flusher.start()
+            atexit.register(flush)
+
+
+def run_flusher():
+    while True:
+        _wake.wait(get_flush_interval())
+        _wake.clear()
+        close_old_connections()
+        try:
+            flush()
+        except Exception as e:
+            print(f"Flushing property views failed: {e}")
+        finally:
+            # The thread lives on between flushes; do not hold a connection meanwhile
+            connection.close()
+
+
+def flush():
+    """Write the buffered views and their daily counts. Returns how many were written."""
+    from .models import Property, PropertyView, PropertyViewDaily, User
+
+    with _lock:
+        events = list(_buffer)
+        _buffer.clear()
+    if not events:
+        return 0
+
+    try:
+        # Listings or accounts deleted since the view was recorded
+        existing = set(Property.objects.filter(id__in={event[0] for event in events}).values_list('id', flat=True))
+        user_ids = {event[1] for event in events if event[1] is not None}
+        users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)) if user_ids else set()
+        events = [
+            (property_id, user_id if user_id in users else None, viewed_at)
+            for property_id, user_id, viewed_at in events if property_id in existing
+        ]
+        counts = Counter((property_id, timezone.localdate(viewed_at)) for property_id, _, viewed_at in events)
+
+        with transaction.atomic():
+            PropertyView.objects.bulk_create([
+                PropertyView(property_id=property_id, user_id=user_id, created_at=viewed_at)
+                for property_id, user_id, viewed_at in events
+            ], batch_size=get_flush_batch())
+            PropertyViewDaily.objects.add(counts)
+    except Exception:
+        # Put the events back for the next flush, ahead of anything recorded since
+        with _lock:
+            recorded_since = list(_buffer)
+            _buffer.clear()
+            _buffer.extend(events)
+            _buffer.extend(recorded_since)
+        raise
+    return len(events)
@@ -1,23 +1,48 @@
 # Try to import GIS modules, fallback if not available
 try:
-    from django.contrib.gis.geos import Point
+    from django.contrib.gis.geos import Point, Polygon
     from django.contrib.gis.measure import Distance
     from django.contrib.gis.db.models.functions import Distance as DistanceFunc
     GIS_AVAILABLE = True
 except ImportError:
     GIS_AVAILABLE = False
     Point = None
+    Polygon = None
     Distance = None
     DistanceFunc = None
 
-from django.db.models import Count
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import Avg, Case, Count, F, FloatField, IntegerField, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import Cast, Floor, Greatest
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, ParseError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import User, Property, Shortlist, IndiaLocation
+from .models import (
+    SEARCH_CONFIG, User, Property, PropertyImage, PropertyViewDaily, Shortlist, IndiaLocation, ImageUpload,
+)
+from .conditional import conditional_view, make_etag
+from .geo import (
+    MAX_SEARCH_DISTANCE_KM, REVERSE_GEOCODE_MAX_KM, AsGeometry, AsMVTGeom, InEnvelope, KNNDistance, Latitude, Longitude,
+    bounding_box, parse_bbox, tile_bounds,
+)
+from .pagination import KeysetCursorPagination
+from .projections import ProjectionRenderer, get_projection_fields, project_properties
+from .query_budget import QueryBudgetMixin
+from . import exports, gazetteer, property_import, search_cache, uploads, view_tracking
+from .readers import detect_format, iter_records
+from .location_index import location_index
+from .spatial_index import NEARBY_CANDIDATE_LIMIT, property_index
+from .versioning import LOCATION_VERSION_KEY, USER_VERSION_KEY, get_version
 from .serializers import (
     UserSerializer, UserRegisterSerializer, UserLoginSerializer,
     OTPSerializer, ResendOTPSerializer, PropertySerializer,
@@ -27,7 +52,13 @@ from .serializers import (
 from django.contrib.auth import login, logout
 from rest_framework.authtoken.models import Token
 import random
+import gzip
+import math
+import hashlib
+import io
+from urllib.parse import urlencode
 from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 from django.utils import timezone
 from django.conf import settings
 from rest_framework.permissions import AllowAny
@@ -243,10 +274,49 @@ class UserProfileView(APIView):
             return Response(user_serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
     filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetCursorPagination
+    # Upper bound on SQL statements per action, token authentication included
+    query_budgets = {
+        'list': 4,
+        'retrieve': 4,
+        'my_properties': 3,
+        'my_property_detail': 3,
+        'shortlisted': 4,
+        'clusters': 2,
+        'tiles': 2,
+        'facets': 2,
+        'export': 2,
+        'view_stats': 3,
+    }
+    # Query parameters that decide which properties match a search, and the
+    # values the frontend sends for an untouched slider (meaning "no filter")
+    search_params = (
+        'my_properties', 'user_latitude', 'user_longitude', 'max_distance',
+        'property_type', 'price__gte', 'price__lte', 'area__gte', 'area__lte',
+        'location__state', 'location__district', 'location__sub_district',
+        'location__village', 'location__pin_code', 'q',
+    )
+    neutral_filter_values = {
+        'price__gte': '0',
+        'price__lte': '10000000',
+        'area__gte': '0',
+        'area__lte': '10000',
+    }
+    # Facet bucket edges; the last bucket is open-ended
+    price_facet_edges = [0, 1000000, 2500000, 5000000, 10000000, 20000000, 50000000]
+    area_facet_edges = [0, 500, 1000, 2000, 5000, 10000]
+    facets_cache_timeout = 60
+    # {property id: metres} of a distance search answered by the in-process
+    # index; set per request by filter_properties
+    nearby_distances = None
+    # Grid cells per 256px map tile edge when clustering, i.e. ~64px clusters
+    cluster_cells_per_tile = 4
+    # Longest window the seller view statistics cover
+    view_stats_max_days = 365
     filterset_fields = {
         'property_type': ['exact'],
         'price': ['gte', 'lte'],
@@ -274,133 +344,338 @@ class PropertyViewSet(viewsets.ModelViewSet):
             # Debug: Log query parameters
             print(f"PropertyViewSet query params: {self.request.query_params}")
             
-            queryset = super().get_queryset()
-            print(f"Base queryset count: {queryset.count()}")
-            
-            # Filter by user if 'my_properties' parameter is present
-            if self.request.query_params.get('my_properties') == 'true' and self.request.user.is_authenticated:
-                queryset = queryset.filter(seller=self.request.user)
-                print(f"Filtered to user properties: {queryset.count()}")
-            
-            # Remove the conflicting annotation since Property model already has shortlisted_by_count property
-            queryset = queryset.select_related('location', 'seller').prefetch_related('images')
-            print(f"After select_related count: {queryset.count()}")
-            
-            # Debug: Show some sample properties
-            sample_properties = list(queryset[:3])
-            for prop in sample_properties:
-                print(f"Sample property: ID={prop.id}, Title={prop.title}, Seller={prop.seller.username if prop.seller else 'None'}")
-            
-            # Add distance-based filtering if user location is provided
-            user_lat = self.request.query_params.get('user_latitude')
-            user_lng = self.request.query_params.get('user_longitude')
-            max_distance = self.request.query_params.get('max_distance', 500)  # Default 500km for broader results
-            
-            if user_lat and user_lng and GIS_AVAILABLE:
-                try:
-                    user_point = Point(float(user_lng), float(user_lat), srid=4326)
-                    queryset = queryset.annotate(
-                        distance=DistanceFunc('geo_location', user_point)
-                    ).filter(distance__lte=Distance(km=max_distance)).order_by('distance')
-                    print(f"Applied distance filter: {max_distance}km from ({user_lat}, {user_lng})")
-                except (ValueError, TypeError) as e:
-                    print(f"Invalid coordinates provided: {e}")
-            elif user_lat and user_lng and not GIS_AVAILABLE:
-                print("GIS not available, skipping distance filtering")
-            
-            # Property type specific filtering
-            property_type = self.request.query_params.get('property_type')
-            if property_type and property_type != '':
-                print(f"Before filtering - Total properties: {queryset.count()}")
-                print(f"Property type choices: {[choice[0] for choice in Property.PROPERTY_TYPES]}")
-                print(f"Filtering by property type: {property_type}")
-                
-                # Check if the property type exists in choices
-                valid_types = [choice[0] for choice in Property.PROPERTY_TYPES]
-                if property_type in valid_types:
-                    queryset = queryset.filter(property_type=property_type)
-                    print(f"After filtering - Properties with type {property_type}: {queryset.count()}")
-                    
-                    # Debug: Show some sample properties
-                    sample_properties = list(queryset[:3])
-                    for prop in sample_properties:
-                        print(f"Sample property: ID={prop.id}, Type={prop.property_type}, Title={prop.title}")
-                else:
-                    print(f"Invalid property type: {property_type}")
-                    print(f"Valid types are: {valid_types}")
-            
-            # Price filtering
-            price_gte = self.request.query_params.get('price__gte')
-            if price_gte and price_gte != '0':
-                queryset = queryset.filter(price__gte=price_gte)
-                print(f"Filtered by price >= {price_gte}")
-            
-            price_lte = self.request.query_params.get('price__lte')
-            if price_lte and price_lte != '10000000':
-                queryset = queryset.filter(price__lte=price_lte)
-                print(f"Filtered by price <= {price_lte}")
-            
-            # Area filtering
-            area_gte = self.request.query_params.get('area__gte')
-            if area_gte and area_gte != '0':
-                queryset = queryset.filter(area__gte=area_gte)
-                print(f"Filtered by area >= {area_gte}")
-            
-            area_lte = self.request.query_params.get('area__lte')
-            if area_lte and area_lte != '10000':
-                queryset = queryset.filter(area__lte=area_lte)
-                print(f"Filtered by area <= {area_lte}")
-            
-            # Manual location filtering
-            location_state = self.request.query_params.get('location__state')
-            if location_state:
-                queryset = queryset.filter(location__state=location_state)
-            
-            location_district = self.request.query_params.get('location__district')
-            if location_district:
-                queryset = queryset.filter(location__district=location_district)
-            
-            location_sub_district = self.request.query_params.get('location__sub_district')
-            if location_sub_district:
-                queryset = queryset.filter(location__sub_district=location_sub_district)
-            
-            location_village = self.request.query_params.get('location__village')
-            if location_village:
-                queryset = queryset.filter(location__village=location_village)
-            
-            location_pin_code = self.request.query_params.get('location__pin_code')
-            if location_pin_code:
-                queryset = queryset.filter(location__pin_code=location_pin_code)
-            
-            # Sorting
-            sort_by = self.request.query_params.get('sort_by')
-            if sort_by == 'price_low':
-                queryset = queryset.order_by('price')
-            elif sort_by == 'price_high':
-                queryset = queryset.order_by('-price')
-            elif sort_by == 'area_low':
-                queryset = queryset.order_by('area')
-            elif sort_by == 'area_high':
-                queryset = queryset.order_by('-area')
-            elif sort_by == 'oldest':
-                queryset = queryset.order_by('created_at')
-            else:  # newest (default)
-                queryset = queryset.order_by('-created_at')
-            
-            print(f"Final queryset: {queryset}")
-            return queryset
+            # Related rows and shortlist counts for the serializer, independent of page size
+            queryset = super().get_queryset().with_details()
+            queryset = self.filter_properties(queryset)
+            return self.sort_properties(queryset)
+        except APIException:
+            # Bad search parameters are the client's to fix
+            raise
         except Exception as e:
             print(f"Error in PropertyViewSet.get_queryset: {e}")
             import traceback
             traceback.print_exc()
             # Return a basic queryset if there's an error
             try:
-                return Property.objects.all().select_related('location', 'seller').prefetch_related('images')
+                return Property.objects.with_details()
             except Exception as fallback_error:
                 print(f"Fallback queryset also failed: {fallback_error}")
                 # Return empty queryset as last resort
                 return Property.objects.none()
 
+    def filter_properties(self, queryset):
+        """Apply the search filters from the query string; shared by every search-shaped action"""
+        # Filter by user if 'my_properties' parameter is present
+        if self.request.query_params.get('my_properties') == 'true' and self.request.user.is_authenticated:
+            queryset = queryset.filter(seller=self.request.user)
+
+        # Add distance-based filtering if user location is provided
+        user_lat = self.request.query_params.get('user_latitude')
+        user_lng = self.request.query_params.get('user_longitude')
+        max_distance = self.search_distance()
+
+        if user_lat and user_lng and GIS_AVAILABLE:
+            try:
+                user_point = Point(float(user_lng), float(user_lat), srid=4326)
+                # Index-backed && prefilter so only rows near the point are measured
+                search_box = Polygon.from_bbox(bounding_box(user_point.y, user_point.x, max_distance))
+                search_box.srid = 4326
+                queryset = queryset.filter(geo_location__bboverlaps=search_box).annotate(
+                    distance=DistanceFunc('geo_location', user_point),
+                    knn_distance=KNNDistance('geo_location', user_point),
+                ).filter(distance__lte=Distance(km=max_distance))
+                print(f"Applied distance filter: {max_distance}km from ({user_lat}, {user_lng})")
+            except (ValueError, TypeError) as e:
+                print(f"Invalid coordinates provided: {e}")
+        elif user_lat and user_lng and property_index is not None:
+            try:
+                # No PostGIS: answer from the in-process NumPy index instead.
+                # The nearest properties in range are kept so the other
+                # filters apply to all of them; list() orders by distance in
+                # Python.
+                ids, distances = property_index.nearby(
+                    float(user_lat), float(user_lng), max_distance, limit=NEARBY_CANDIDATE_LIMIT
+                )
+                self.nearby_distances = dict(zip(ids, distances))
+                queryset = queryset.filter(id__in=ids)
+                print(f"Applied in-process distance filter: {max_distance}km from ({user_lat}, {user_lng})")
+            except (ValueError, TypeError) as e:
+                print(f"Invalid coordinates provided: {e}")
+        elif user_lat and user_lng:
+            print("GIS not available, skipping distance filtering")
+
+        # Property type specific filtering
+        property_type = self.request.query_params.get('property_type')
+        if property_type and property_type != '':
+            valid_types = [choice[0] for choice in Property.PROPERTY_TYPES]
+            if property_type in valid_types:
+                queryset = queryset.filter(property_type=property_type)
+            else:
+                print(f"Invalid property type: {property_type}")
+                print(f"Valid types are: {valid_types}")
+
+        # Price and area ranges, parsed up front so a malformed value is a 400
+        price_gte = self.search_decimal('price__gte')
+        if price_gte is not None:
+            queryset = queryset.filter(price__gte=price_gte)
+            print(f"Filtered by price >= {price_gte}")
+
+        price_lte = self.search_decimal('price__lte')
+        if price_lte is not None:
+            queryset = queryset.filter(price__lte=price_lte)
+            print(f"Filtered by price <= {price_lte}")
+
+        area_gte = self.search_decimal('area__gte')
+        if area_gte is not None:
+            queryset = queryset.filter(area__gte=area_gte)
+            print(f"Filtered by area >= {area_gte}")
+
+        area_lte = self.search_decimal('area__lte')
+        if area_lte is not None:
+            queryset = queryset.filter(area__lte=area_lte)
+            print(f"Filtered by area <= {area_lte}")
+
+        # Manual location filtering
+        location_state = self.request.query_params.get('location__state')
+        if location_state:
+            queryset = queryset.filter(location__state=location_state)
+
+        location_district = self.request.query_params.get('location__district')
+        if location_district:
+            queryset = queryset.filter(location__district=location_district)
+
+        location_sub_district = self.request.query_params.get('location__sub_district')
+        if location_sub_district:
+            queryset = queryset.filter(location__sub_district=location_sub_district)
+
+        location_village = self.request.query_params.get('location__village')
+        if location_village:
+            queryset = queryset.filter(location__village=location_village)
+
+        location_pin_code = self.request.query_params.get('location__pin_code')
+        if location_pin_code:
+            queryset = queryset.filter(location__pin_code=location_pin_code)
+
+        # Keyword search over the GIN-indexed search_vector
+        keywords = self.request.query_params.get('q', '').strip()
+        if keywords:
+            search_query = SearchQuery(keywords, search_type='websearch', config=SEARCH_CONFIG)
+            queryset = queryset.filter(search_vector=search_query).annotate(
+                search_rank=SearchRank(F('search_vector'), search_query)
+            )
+        
+        return queryset
+
+    def search_decimal(self, name):
+        """
+        A numeric search parameter as a Decimal, or None when it is absent or
+        the neutral slider value. Raises ParseError (400) when malformed.
+        """
+        value = self.request.query_params.get(name, '').strip()
+        if not value or value == self.neutral_filter_values.get(name):
+            return None
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            number = None
+        if number is None or not number.is_finite():
+            raise ParseError(f'{name} must be a number')
+        return number
+
+    def search_distance(self):
+        """
+        max_distance in km, defaulting to and capped at MAX_SEARCH_DISTANCE_KM.
+        Raises ParseError (400) unless it is a positive number.
+        """
+        value = self.request.query_params.get('max_distance', '').strip()
+        if not value:
+            return MAX_SEARCH_DISTANCE_KM
+        try:
+            distance = float(value)
+        except ValueError:
+            distance = math.nan
+        if not 0 < distance < math.inf:
+            raise ParseError('max_distance must be a positive number of kilometres')
+        return min(distance, MAX_SEARCH_DISTANCE_KM)
+
+    def get_filter_key(self):
+        """
+        Canonical string for the active search filters: irrelevant and neutral
+        parameters dropped, the rest sorted. Equal searches give equal keys.
+        """
+        params = self.request.query_params
+        items = sorted(
+            (name, params[name].strip()) for name in self.search_params
+            if params.get(name, '').strip() not in ('', self.neutral_filter_values.get(name))
+        )
+        if params.get('my_properties') == 'true' and self.request.user.is_authenticated:
+            items.append(('seller', str(self.request.user.pk)))
+        return urlencode(items)
+
+    def sort_properties(self, queryset):
+        # Sorting (the paginator appends `id` as the keyset tie-breaker)
+        sort_by = self.request.query_params.get('sort_by')
+        has_knn = 'knn_distance' in queryset.query.annotations
+        has_rank = 'search_rank' in queryset.query.annotations
+        if has_rank and sort_by in (None, '', 'relevance'):
+            queryset = queryset.order_by('-search_rank')
+        elif has_knn and sort_by in (None, '', 'nearest'):
+            # KNN order straight off the GiST index on geo_location
+            queryset = queryset.order_by('knn_distance')
+        elif has_knn and sort_by == 'distance':
+            queryset = queryset.order_by('distance')
+        elif sort_by == 'popular':
+            queryset = queryset.order_by('-shortlist_count')
+        elif sort_by == 'price_low':
+            queryset = queryset.order_by('price')
+        elif sort_by == 'price_high':
+            queryset = queryset.order_by('-price')
+        elif sort_by == 'area_low':
+            queryset = queryset.order_by('area')
+        elif sort_by == 'area_high':
+            queryset = queryset.order_by('-area')
+        elif sort_by == 'oldest':
+            queryset = queryset.order_by('created_at')
+        else:  # newest (default)
+            queryset = queryset.order_by('-created_at')
+        
+        return queryset
+
+    @conditional_view('get_list_etag')
+    def list(self, request, *args, **kwargs):
+        """
+        Search results. `view=card` or `fields=a,b,c` switches to a column
+        projection that skips the full serializer.
+        """
+        try:
+            fields = get_projection_fields(request.query_params)
+        except ValueError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if fields is None:
+            queryset = self.filter_queryset(self.get_queryset())
+        else:
+            queryset = self.sort_properties(self.filter_properties(Property.objects.all()))
+            queryset = project_properties(queryset, fields)
+
+        if self.orders_by_nearby_distance():
+            page = self.paginate_nearby(queryset)
+        else:
+            page = self.paginate_cached(queryset)
+            if page is None:
+                page = self.paginate_queryset(queryset)
+
+        if fields is None:
+            data = self.get_serializer(page, many=True).data
+        else:
+            data = ProjectionRenderer(fields, request).render(page)
+        return self.get_paginated_response(data)
+
+    def get_list_etag(self, request, *args, **kwargs):
+        # Same version stamps as the search cache, plus shortlist counts and seller details shown on every result
+        params = request.query_params
+        state, district = params.get('location__state'), params.get('location__district')
+        version = search_cache.search_version(district=district if state else None, state=state, popularity=True)
+        return make_etag(
+            request, 'property-list', version, get_version(USER_VERSION_KEY),
+            self.get_filter_key(), request.get_full_path()
+        )
+
+    @conditional_view('get_detail_etag')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # A 304 is a repeat visit answered from the browser's copy; it counts too.
+        # Buffered in memory and written in batches (core.view_tracking).
+        if self.action == 'retrieve' and response.status_code in (200, 304):
+            view_tracking.record(int(self.kwargs['pk']), request.user.pk)
+        return response
+
+    def get_detail_etag(self, request, pk=None, **kwargs):
+        # One indexed lookup; image changes touch updated_at (see core.signals)
+        try:
+            row = Property.objects.filter(pk=pk).values_list('updated_at', 'shortlist_count').first()
+        except (ValueError, TypeError):
+            return None
+        if row is None:
+            return None
+        updated_at, shortlist_count = row
+        return make_etag(
+            request, 'property', pk, updated_at.isoformat(), shortlist_count,
+            get_version(LOCATION_VERSION_KEY), get_version(USER_VERSION_KEY)
+        )
+
+    def orders_by_nearby_distance(self):
+        """Whether results come from the in-process index and are sorted by distance"""
+        if self.nearby_distances is None:
+            return False
+        sort_by = self.request.query_params.get('sort_by')
+        if sort_by in (None, ''):
+            return not self.request.query_params.get('q', '').strip()
+        return sort_by in ('nearest', 'distance')
+
+    def paginate_nearby(self, queryset):
+        """
+        Page the matches of an in-process distance search nearest first. One
+        query lists the ids left after the other filters; they are ordered by
+        their index distance here and only the page's rows are loaded.
+        """
+        distances = self.nearby_distances
+        ids = queryset.order_by().prefetch_related(None).values_list('id', flat=True)
+        positions = sorted([distances[pk], pk] for pk in ids)
+        page = self.paginator.paginate_positions(queryset, positions, self.request, ordering=['knn_distance', 'id'])
+        if page is None:
+            raise NotFound(self.paginator.invalid_cursor_message)
+        for row in page:
+            pk = row['id'] if isinstance(row, dict) else row.pk
+            if isinstance(row, dict):
+                row['knn_distance'] = row['distance'] = distances[pk]
+            else:
+                row.knn_distance = row.distance = distances[pk]
+        return page
+
+    def paginate_cached(self, queryset):
+        """
+        Serve the page from the cached ordered result of this search, computing
+        and caching it on a miss. Returns None when the search is too broad to
+        cache or the cursor is unknown, so the caller pages from the database.
+        """
+        params = self.request.query_params
+        ordering = self.paginator.get_ordering(queryset)
+        names = [field.lstrip('-') for field in ordering]
+        state, district = params.get('location__state'), params.get('location__district')
+        key = search_cache.search_key(
+            self.get_filter_key() + f"&sort_by={params.get('sort_by', '')}",
+            ordering,
+            district=district if state else None,
+            state=state,
+            popularity='shortlist_count' in names,
+        )
+
+        positions = search_cache.get_positions(key)
+        if positions is None:
+            rows = list(
+                queryset.order_by(*ordering).prefetch_related(None)
+                .values(*names)[:search_cache.SEARCH_CACHE_MAX_RESULTS + 1]
+            )
+            if len(rows) > search_cache.SEARCH_CACHE_MAX_RESULTS:
+                positions = search_cache.TOO_BROAD
+            else:
+                positions = [[self.paginator.get_position_value(row, name) for name in names] for row in rows]
+            search_cache.set_positions(key, positions)
+
+        if positions == search_cache.TOO_BROAD:
+            return None
+        return self.paginator.paginate_positions(queryset, positions, self.request)
+
+    def paginate_queryset(self, queryset):
+        # Only the search listing is cursor-paginated; the other collection
+        # actions keep returning the plain arrays the frontend expects.
+        if self.action != 'list':
+            return None
+        return super().paginate_queryset(queryset)
+
     def perform_create(self, serializer):
         # Ensure the seller is set to the current authenticated user
         serializer.save(seller=self.request.user)
@@ -434,12 +709,13 @@ class PropertyViewSet(viewsets.ModelViewSet):
     def my_properties(self, request):
         """Get properties created by the current user"""
         try:
-            properties = Property.objects.filter(seller=request.user).select_related('location', 'seller').prefetch_related('images').order_by('-created_at')
+            properties = Property.objects.filter(seller=request.user).with_details().order_by('-created_at')
             serializer = PropertySerializer(properties, many=True, context={'request': request})
+            data = serializer.data
             return Response({
                 'message': 'Your properties retrieved successfully',
-                'count': properties.count(),
-                'properties': serializer.data
+                'count': len(data),
+                'properties': data
             })
         except Exception as e:
             print(f"Error fetching user properties: {e}")
@@ -452,7 +728,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
     def my_property_detail(self, request, pk=None):
         """Get a specific property created by the current user"""
         try:
-            property = Property.objects.filter(seller=request.user, id=pk).select_related('location', 'seller').prefetch_related('images').first()
+            property = Property.objects.filter(seller=request.user, id=pk).with_details().first()
             if not property:
                 return Response({
                     'message': 'Property not found or you do not have permission to view it'
@@ -470,35 +746,352 @@ class PropertyViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=500)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path='view-stats')
+    def view_stats(self, request):
+        """
+        Views of the current seller's properties over the last `days` days
+        (default 30), per day and per property, read from the daily rollups.
+        Views from the last few seconds may not be counted yet.
+        """
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), self.view_stats_max_days)
+        except ValueError:
+            return Response({'message': 'days must be a whole number'}, status=status.HTTP_400_BAD_REQUEST)
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rollups = PropertyViewDaily.objects.filter(property__seller=request.user, date__gte=since)
+
+        daily = list(rollups.order_by('date').values('date').annotate(views=Sum('views')))
+        by_property = list(
+            rollups.values('property_id', 'property__title').annotate(views=Sum('views')).order_by('-views', 'property_id')
+        )
+        return Response({
+            'since': since,
+            'total': sum(day['views'] for day in daily),
+            'daily': daily,
+            'properties': [
+                {'id': row['property_id'], 'title': row['property__title'], 'views': row['views']}
+                for row in by_property
+            ],
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every property matching the search filters as `output=csv`
+        (default), `ndjson` or `geojson`. `fields=a,b,c` picks the columns.
+        Rows are read through a server-side cursor and written out as they
+        arrive, so exports of any size start immediately in constant memory.
+        """
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in exports.EXPORT_FORMATS:
+            return Response(
+                {'message': f"output must be one of: {', '.join(exports.EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            fields = get_projection_fields(request.query_params) or list(exports.EXPORT_FIELDS)
+        except ValueError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.sort_properties(self.filter_properties(Property.objects.all()))
+        rows = project_properties(queryset, fields)
+        media_prefix = request.build_absolute_uri(PropertyImage._meta.get_field('image').storage.url(''))
+        content_type, extension = exports.EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            exports.stream(rows, fields, export_format, media_prefix), content_type=content_type
+        )
+        filename = f"properties-{timezone.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Keep proxies from buffering the whole export before passing it on
+        response['X-Accel-Buffering'] = 'no'
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated], url_path='import')
+    def bulk_import(self, request):
+        """
+        Create many properties from an uploaded CSV or NDJSON `file`, one row
+        per listing. Returns the number created and the errors of every
+        rejected row.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'message': 'Attach a CSV or NDJSON file as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.query_params.get('format') or detect_format(upload.name)
+        if file_format not in ('csv', 'ndjson'):
+            return Response({'message': 'Only CSV and NDJSON files are supported'}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = property_import.import_properties(request.user, enumerate(iter_records(stream, file_format), 1))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'message': f'Could not read the file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        print(f"Bulk import by {request.user.username}: {report['created']} created, {len(report['errors'])} rejected")
+        return Response({'created': report['created'], 'failed': len(report['errors']), 'errors': report['errors']})
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated], url_path='uploads')
+    def start_upload(self, request, pk=None):
+        """Begin a resumable image upload: {"filename": ..., "size": bytes}"""
+        property = Property.objects.filter(seller=request.user, id=pk).first()
+        if not property:
+            return Response({'message': 'Property not found or you do not have permission to edit it'}, status=404)
+        try:
+            upload = uploads.start(request.user, property, request.data.get('filename'), int(request.data.get('size', 0)))
+        except (TypeError, ValueError):
+            return Response({'message': 'size must be a number of bytes'}, status=status.HTTP_400_BAD_REQUEST)
+        except uploads.UploadError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.upload_state(upload), status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True, methods=['get', 'patch'], permission_classes=[IsAuthenticated],
+        url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})'
+    )
+    def upload(self, request, pk=None, upload_id=None):
+        """
+        GET: how many bytes have arrived, to resume from. PATCH: append the raw
+        request body, starting at the `Upload-Offset` header.
+        """
+        if request.method == 'GET':
+            upload = ImageUpload.objects.filter(id=upload_id, owner=request.user, property_id=pk).first()
+        else:
+            try:
+                offset = int(request.META.get('HTTP_UPLOAD_OFFSET', request.query_params.get('offset', '')))
+                length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                return Response({'message': 'Upload-Offset header required'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                upload = uploads.append(upload_id, request.user, pk, offset, length, request.stream)
+            except uploads.UploadError as e:
+                # 409 tells the client to resume from the offset we hold
+                code = status.HTTP_409_CONFLICT if e.offset is not None else status.HTTP_400_BAD_REQUEST
+                return Response({'message': str(e), 'offset': e.offset}, status=code)
+        if upload is None:
+            return Response({'message': 'Upload not found'}, status=404)
+        return Response(self.upload_state(upload))
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated], url_path='uploads/finalize')
+    def finalize_uploads(self, request, pk=None):
+        """Attach finished uploads to the property: {"uploads": [id, ...]} in display order"""
+        property = Property.objects.filter(seller=request.user, id=pk).first()
+        if not property:
+            return Response({'message': 'Property not found or you do not have permission to edit it'}, status=404)
+        upload_ids = request.data.get('uploads')
+        if not isinstance(upload_ids, list) or not upload_ids:
+            return Response({'message': 'uploads must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            image_ids = uploads.finish(request.user, property, upload_ids)
+        except uploads.UploadError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError:
+            return Response({'message': 'Invalid upload id'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'images': image_ids}, status=status.HTTP_201_CREATED)
+
+    def upload_state(self, upload):
+        return {
+            'id': str(upload.id),
+            'filename': upload.filename,
+            'size': upload.size,
+            'offset': upload.received,
+            'complete': upload.is_complete,
+            'max_chunk_size': uploads.MAX_CHUNK_SIZE,
+        }
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def shortlist(self, request, pk=None):
         property = self.get_object()
-        Shortlist.objects.get_or_create(
-            buyer=request.user,
-            property=property
-        )
+        # The shortlist row and the counter increment commit together
+        with transaction.atomic():
+            Shortlist.objects.get_or_create(
+                buyer=request.user,
+                property=property
+            )
         return Response({'status': 'shortlisted'}, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['delete'], permission_classes=[IsAuthenticated])
     def remove_shortlist(self, request, pk=None):
         property = self.get_object()
-        Shortlist.objects.filter(
-            buyer=request.user,
-            property=property
-        ).delete()
+        with transaction.atomic():
+            Shortlist.objects.filter(
+                buyer=request.user,
+                property=property
+            ).delete()
         return Response({'status': 'removed from shortlist'}, status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def shortlisted(self, request):
-        shortlisted = Shortlist.objects.filter(buyer=request.user)
+        shortlisted = Shortlist.objects.filter(buyer=request.user).with_property_details()
         page = self.paginate_queryset(shortlisted)
         if page is not None:
-            serializer = ShortlistSerializer(page, many=True)
+            serializer = ShortlistSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
         
-        serializer = ShortlistSerializer(shortlisted, many=True)
+        serializer = ShortlistSerializer(shortlisted, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts per property type, price bucket, area bucket and district for
+        the current search, from a single GROUPING SETS scan. Cached briefly
+        per normalized filter set.
+        """
+        cache_key = 'property-facets:' + hashlib.md5(self.get_filter_key().encode('utf-8')).hexdigest()
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = self.compute_facets()
+            cache.set(cache_key, facets, self.facets_cache_timeout)
+        return Response(facets)
+
+    def compute_facets(self):
+        def bucket(field, edges):
+            return Case(
+                *[When(**{f'{field}__lt': upper, 'then': Value(i)}) for i, upper in enumerate(edges[1:])],
+                default=Value(len(edges) - 1), output_field=IntegerField()
+            )
+
+        rows = self.filter_properties(Property.objects.order_by()).annotate(
+            price_bucket=bucket('price', self.price_facet_edges),
+            area_bucket=bucket('area', self.area_facet_edges),
+            district=F('location__district'),
+        ).values('property_type', 'price_bucket', 'area_bucket', 'district')
+        rows_sql, params = rows.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT GROUPING(property_type), GROUPING(price_bucket), GROUPING(area_bucket), "
+                "property_type, price_bucket, area_bucket, district, COUNT(*) "
+                f"FROM ({rows_sql}) AS rows "
+                "GROUP BY GROUPING SETS ((property_type), (price_bucket), (area_bucket), (district))",
+                params
+            )
+            grouped = cursor.fetchall()
+
+        type_counts, price_counts, area_counts, district_counts = {}, {}, {}, {}
+        for no_type, no_price, no_area, property_type, price_bucket, area_bucket, district, count in grouped:
+            if not no_type:
+                type_counts[property_type] = count
+            elif not no_price:
+                price_counts[price_bucket] = count
+            elif not no_area:
+                area_counts[area_bucket] = count
+            else:
+                district_counts[district] = count
+
+        def bucket_counts(edges, counts):
+            uppers = edges[1:] + [None]
+            return [
+                {'min': lower, 'max': upper, 'count': counts.get(i, 0)}
+                for i, (lower, upper) in enumerate(zip(edges, uppers))
+            ]
+
+        return {
+            'property_type': [
+                {'value': value, 'label': label, 'count': type_counts.get(value, 0)}
+                for value, label in Property.PROPERTY_TYPES
+            ],
+            'price': bucket_counts(self.price_facet_edges, price_counts),
+            'area': bucket_counts(self.area_facet_edges, area_counts),
+            'district': [
+                {'value': district, 'count': count}
+                for district, count in sorted(district_counts.items(), key=lambda item: (-item[1], item[0]))
+            ],
+        }
+
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Grid-snapped marker clusters for a map viewport, computed in one
+        GROUP BY. Takes bbox=min_lng,min_lat,max_lng,max_lat and zoom plus
+        the usual search filters.
+        """
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox', ''))
+            zoom = int(request.query_params.get('zoom', ''))
+            if not 0 <= zoom <= 22:
+                raise ValueError(f"Invalid zoom: {zoom}")
+        except (TypeError, ValueError):
+            return Response({
+                'message': 'bbox=min_lng,min_lat,max_lng,max_lat and zoom (0-22) are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not GIS_AVAILABLE:
+            return Response({'message': 'Map clustering requires GIS support'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        cell_size = 360.0 / (2 ** zoom) / self.cluster_cells_per_tile
+
+        queryset = self.filter_properties(Property.objects.order_by())
+        clusters = queryset.filter(InEnvelope(AsGeometry('geo_location'), bbox)).annotate(
+            cell_x=Floor(Longitude('geo_location') / Value(cell_size)),
+            cell_y=Floor(Latitude('geo_location') / Value(cell_size)),
+        ).values('cell_x', 'cell_y').annotate(
+            count=Count('id'),
+            longitude=Avg(Longitude('geo_location')),
+            latitude=Avg(Latitude('geo_location')),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            property_id=Min('id'),
+        )
+
+        return Response({
+            'zoom': zoom,
+            'cell_size': cell_size,
+            'clusters': [{
+                'latitude': cluster['latitude'],
+                'longitude': cluster['longitude'],
+                'count': cluster['count'],
+                'min_price': cluster['min_price'],
+                'max_price': cluster['max_price'],
+                # Single-property cells can be drawn as a plain marker
+                'property_id': cluster['property_id'] if cluster['count'] == 1 else None,
+            } for cluster in clusters]
+        })
+
+    def tiles(self, request, z, x, y):
+        """
+        Mapbox Vector Tile of the properties matching the search filters,
+        encoded by PostGIS. Routed as /properties/tiles/{z}/{x}/{y}.mvt.
+        With `v` set to the X-Tile-Version of the data, the tile is cacheable
+        forever.
+        """
+        if not (0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return Response({'message': 'Tile out of range'}, status=status.HTTP_404_NOT_FOUND)
+        if not GIS_AVAILABLE:
+            return Response({'message': 'Vector tiles require GIS support'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        features = self.filter_properties(Property.objects.order_by()) \
+            .filter(InEnvelope(AsGeometry('geo_location'), tile_bounds(z, x, y))) \
+            .annotate(
+                mvt_geom=AsMVTGeom('geo_location', z, x, y),
+                mvt_price=Cast('price', FloatField()),
+                mvt_area=Cast('area', FloatField()),
+            ).values('id', 'property_type', 'mvt_price', 'mvt_area', 'mvt_geom')
+        features_sql, params = features.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT ST_AsMVT(tile, 'properties', 4096, 'geom') FROM ("
+                "SELECT id, property_type, mvt_price AS price, mvt_area AS area, mvt_geom AS geom "
+                f"FROM ({features_sql}) AS features WHERE mvt_geom IS NOT NULL"
+                ") AS tile",
+                params
+            )
+            tile = cursor.fetchone()[0]
+
+        response = HttpResponse(bytes(tile or b''), content_type='application/vnd.mapbox-vector-tile')
+        # Any property change bumps the global search version, so a tile URL
+        # carrying the current version never changes; clients read the
+        # version to use from this header
+        version = search_cache.search_version()
+        response['X-Tile-Version'] = version
+        if request.query_params.get('v') == version:
+            patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=300)
+        return response
+
     @action(detail=False, methods=['get'])
     def test(self, request):
         """Test endpoint to debug serialization issues"""
@@ -531,9 +1124,110 @@ class PropertyViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=500)
 
-class LocationViewSet(viewsets.ReadOnlyModelViewSet):
+# Shown by the location dropdowns until the gazetteer has been loaded
+SAMPLE_STATES = ('Maharashtra', 'Karnataka', 'Tamil Nadu', 'Delhi', 'Gujarat')
+SAMPLE_DISTRICTS = {
+    'Maharashtra': ['Ahmednagar', 'Akola', 'Amravati', 'Aurangabad', 'Beed', 'Bhandara', 'Buldhana', 'Chandrapur', 'Dhule', 'Gadchiroli', 'Gondia', 'Hingoli', 'Jalgaon', 'Jalna', 'Kolhapur', 'Latur', 'Mumbai City', 'Mumbai Suburban', 'Nagpur', 'Nanded', 'Nandurbar', 'Nashik', 'Osmanabad', 'Palghar', 'Parbhani', 'Pune', 'Raigad', 'Ratnagiri', 'Sangli', 'Satara', 'Sindhudurg', 'Solapur', 'Thane', 'Wardha', 'Washim', 'Yavatmal'],
+    'Karnataka': ['Bagalkot', 'Ballari', 'Belagavi', 'Bengaluru Rural', 'Bengaluru Urban', 'Bidar', 'Chamarajanagar', 'Chikballapur', 'Chikkamagaluru', 'Chitradurga', 'Dakshina Kannada', 'Davanagere', 'Dharwad', 'Gadag', 'Hassan', 'Haveri', 'Kalaburagi', 'Kodagu', 'Kolar', 'Koppal', 'Mandya', 'Mysuru', 'Raichur', 'Ramanagara', 'Shivamogga', 'Tumakuru', 'Udupi', 'Uttara Kannada', 'Vijayapura', 'Vijayanagara', 'Yadgir'],
+    'Tamil Nadu': ['Ariyalur', 'Chengalpattu', 'Chennai', 'Coimbatore', 'Cuddalore', 'Dharmapuri', 'Dindigul', 'Erode', 'Kallakurichi', 'Kancheepuram', 'Karur', 'Krishnagiri', 'Madurai', 'Mayiladuthurai', 'Nagapattinam', 'Namakkal', 'Nilgiris', 'Perambalur', 'Pudukkottai', 'Ramanathapuram', 'Ranipet', 'Salem', 'Sivaganga', 'Tenkasi', 'Thanjavur', 'Theni', 'Thoothukudi', 'Tiruchirappalli', 'Tirunelveli', 'Tirupathur', 'Tiruppur', 'Tiruvallur', 'Tiruvannamalai', 'Tiruvarur', 'Vellore', 'Viluppuram', 'Virudhunagar'],
+    'Uttar Pradesh': ['Agra', 'Aligarh', 'Allahabad', 'Ambedkar Nagar', 'Amethi', 'Amroha', 'Auraiya', 'Ayodhya', 'Azamgarh', 'Baghpat', 'Bahraich', 'Ballia', 'Balrampur', 'Banda', 'Barabanki', 'Bareilly', 'Basti', 'Bhadohi', 'Bijnor', 'Budaun', 'Bulandshahr', 'Chandauli', 'Chitrakoot', 'Deoria', 'Etah', 'Etawah', 'Farrukhabad', 'Fatehpur', 'Firozabad', 'Gautam Buddha Nagar', 'Ghaziabad', 'Ghazipur', 'Gonda', 'Gorakhpur', 'Hamirpur', 'Hapur', 'Hardoi', 'Hathras', 'Jalaun', 'Jaunpur', 'Jhansi', 'Kannauj', 'Kanpur Dehat', 'Kanpur Nagar', 'Kasganj', 'Kaushambi', 'Kheri', 'Kushinagar', 'Lalitpur', 'Lucknow', 'Maharajganj', 'Mahoba', 'Mainpuri', 'Mathura', 'Mau', 'Meerut', 'Mirzapur', 'Moradabad', 'Muzaffarnagar', 'Pilibhit', 'Pratapgarh', 'Prayagraj', 'Raebareli', 'Rampur', 'Saharanpur', 'Sambhal', 'Sant Kabir Nagar', 'Shahjahanpur', 'Shamli', 'Shravasti', 'Siddharthnagar', 'Sitapur', 'Sonbhadra', 'Sultanpur', 'Unnao', 'Varanasi'],
+    'Rajasthan': ['Ajmer','Alwar','Anupgarh','Balotra','Banswara','Baran','Barmer','Beawar','Bharatpur','Bhilwara','Bikaner','Bundi','Chittorgarh','Churu','Dausa','Deeg','Didwana-Kuchaman','Dholpur','Dudu','Dungarpur','Gangapur City','Hanumangarh','Jaipur','Jaipur Rural','Jaisalmer','Jalore','Jhalawar','Jhunjhunu','Jodhpur','Jodhpur Rural','Karauli','Kekri','Khairthal-Tijara','Kota','Kotputli-Behror','Nagaur','Neem Ka Thana','Pali','Phalodi','Pratapgarh','Rajsamand','Salumbar','Sanchore','Sawai Madhopur','Shahpura','Sikar','Sirohi','Sri Ganganagar','Tonk','Udaipur'],
+    'Madhya Pradesh': ['Agar Malwa', 'Alirajpur', 'Anuppur', 'Ashoknagar', 'Balaghat', 'Barwani', 'Betul', 'Bhind', 'Bhopal', 'Burhanpur', 'Chhatarpur', 'Chhindwara', 'Damoh', 'Datia', 'Dewas', 'Dhar', 'Dindori', 'Guna', 'Gwalior', 'Harda', 'Hoshangabad', 'Indore', 'Jabalpur', 'Jhabua', 'Katni', 'Khandwa', 'Khargone', 'Mandla', 'Mandsaur', 'Morena', 'Narsinghpur', 'Neemuch', 'Panna', 'Raisen', 'Rajgarh', 'Ratlam', 'Rewa', 'Sagar', 'Satna', 'Sehore', 'Seoni', 'Shahdol', 'Shajapur', 'Sheopur', 'Shivpuri', 'Sidhi', 'Singrauli', 'Tikamgarh', 'Ujjain', 'Umaria', 'Vidisha'],
+    'Himachal Pradesh': ['Bilaspur', 'Chamba', 'Hamirpur', 'Kangra', 'Kinnaur', 'Kullu', 'Lahaul and Spiti', 'Mandi', 'Shimla', 'Solan', 'Sirmour', 'Una'],
+    'Jammu and Kashmir': ['Anantnag', 'Bandipora', 'Baramulla', 'Budgam', 'Doda', 'Ganderbal', 'Jammu', 'Kathua', 'Kishtwar', 'Kulgam', 'Kupwara', 'Poonch', 'Pulwama', 'Rajouri', 'Ramban', 'Reasi', 'Samba', 'Shopian', 'Srinagar', 'Udhampur'],
+    'Ladakh': ['Changthang', 'Drass', 'Kargil', 'Leh', 'Nubra', 'Sham', 'Zanskar'],
+    'Jharkhand': ['Bokaro', 'Chatra', 'Deoghar', 'Dhanbad', 'Dumka', 'East Singhbhum', 'Garhwa', 'Giridih', 'Godda', 'Gumla', 'Hazaribagh', 'Jamtara', 'Khunti', 'Koderma', 'Latehar', 'Lohardaga', 'Pakur', 'Palamu', 'Ramgarh', 'Ranchi', 'Sahebganj', 'Saraikela Kharsawan', 'Simdega', 'West Singhbhum'],
+    'Kerala': ['Alappuzha', 'Ernakulam', 'Idukki', 'Kannur', 'Kasaragod', 'Kollam', 'Kottayam', 'Kozhikode', 'Malappuram', 'Palakkad', 'Pathanamthitta', 'Thrissur', 'Thiruvananthapuram', 'Wayanad'],
+    'Meghalaya': ['East Garo Hills', 'East Jaintia Hills', 'East Khasi Hills', 'Eastern West Khasi Hills', 'North Garo Hills', 'Ri-Bhoi', 'South Garo Hills', 'South West Garo Hills', 'South West Khasi Hills', 'West Garo Hills', 'West Jaintia Hills', 'West Khasi Hills'],
+    'Mizoram': ['Aizawl', 'Champhai', 'Hnahthial', 'Khawzawl', 'Kolasib', 'Lawngtlai', 'Lunglei', 'Mamit', 'Saiha', 'Serchhip', 'Saitual'],
+    'Nagaland': ['Chümoukedima', 'Dimapur', 'Kiphire', 'Kohima', 'Longleng', 'Meluri', 'Mokokchung', 'Mon', 'Niuland', 'Noklak', 'Peren', 'Phek', 'Shamator', 'Tuensang', 'Tseminyü', 'Wokha', 'Zünheboto'],
+    'Odisha': ['Angul','Balangir','Balasore','Bargarh','Bhadrak','Boudh','Cuttack','Deogarh','Dhenkanal','Gajapati','Ganjam','Jagatsinghpur','Jajpur','Jharsuguda','Kalahandi','Kandhamal','Kendrapara','Kendujhar (Keonjhar)','Khordha','Koraput','Malkangiri','Mayurbhanj','Nabarangpur','Nayagarh','Nuapada','Puri','Rayagada','Sambalpur','Subarnapur (Sonepur)','Sundargarh'],
+    'Puducherry': ['Puducherry', 'Karaikal', 'Mahe', 'Yanam'],
+    'Punjab': ['Amritsar','Barnala','Bathinda','Faridkot','Fatehgarh Sahib','Fazilka','Ferozepur','Gurdaspur','Hoshiarpur','Jalandhar','Kapurthala','Ludhiana','Malerkotla','Mansa','Moga','Pathankot','Patiala','Rupnagar','Sahibzada Ajit Singh Nagar (Mohali)','Sangrur','Shahid Bhagat Singh Nagar (Nawanshahr)','Sri Muktsar Sahib','Tarn Taran'],
+    'Sikkim': ['Gangtok', 'Mangan', 'Namchi', 'Gyalshing', 'Pakyong', 'Soreng'],
+    'Tripura': ['Dhalai','Gomati','Khowai','North Tripura','Sipahijala','South Tripura','Unakoti','West Tripura'],
+    'Uttarakhand': ['Almora','Bageshwar','Chamoli','Champawat','Dehradun','Haridwar','Nainital','Pauri Garhwal','Pithoragarh','Rudraprayag','Tehri Garhwal','Udham Singh Nagar','Uttarkashi'],
+    'West Bengal': ['Alipurduar','Bankura','Birbhum','Cooch Behar','Dakshin Dinajpur (South Dinajpur)','Darjeeling','Hooghly','Howrah','Jalpaiguri','Jhargram','Kalimpong','Kolkata','Malda','Murshidabad','Nadia','North 24 Parganas','Paschim Bardhaman (West Bardhaman)','Paschim Medinipur (West Medinipur)','Purba Bardhaman (East Bardhaman)','Purba Medinipur (East Medinipur)','Purulia','South 24 Parganas','Uttar Dinajpur (North Dinajpur)'],
+    'Telangana': ['Adilabad','Bhadradri Kothagudem','Hanumakonda','Hyderabad','Jagtial','Jangaon','Jayashankar Bhupalpally','Jogulamba Gadwal','Kamareddy','Karimnagar','Khammam','Kumuram Bheem Asifabad','Mahabubabad','Mahabubnagar','Mancherial','Medak','Medchal–Malkajgiri','Mulugu','Nagarkurnool','Nalgonda','Narayanpet','Nirmal','Nizamabad','Peddapalli','Rajanna Sircilla','Rangareddy','Sangareddy','Siddipet','Suryapet','Vikarabad','Wanaparthy','Warangal','Yadadri Bhuvanagiri'],
+    'Manipur': ['Bishnupur', 'Chandel', 'Churachandpur', 'Imphal East', 'Imphal West', 'Jiribam', 'Kakching', 'Kamjong', 'Kangpokpi', 'Noney', 'Pherzawl', 'Senapati', 'Tamenglong', 'Tengnoupal', 'Thoubal', 'Ukhrul'],
+    'Lakshadweep': ['Lakshadweep'],
+    'Delhi': ['Central Delhi', 'East Delhi', 'New Delhi', 'North Delhi', 'North East Delhi', 'North West Delhi', 'Shahdara', 'South Delhi', 'South East Delhi', 'South West Delhi', 'West Delhi'],
+    'Goa': ['North Goa', 'South Goa'],
+    'Gujarat': ['Ahmedabad', 'Amreli', 'Anand', 'Aravalli', 'Banaskantha', 'Bharuch', 'Bhavnagar', 'Botad', 'Chhota Udaipur', 'Dahod', 'Dang', 'Devbhoomi Dwarka', 'Gandhinagar', 'Gir Somnath', 'Jamnagar', 'Junagadh', 'Kheda', 'Kutch', 'Mahisagar', 'Mehsana', 'Morbi', 'Narmada', 'Navsari', 'Panchmahal', 'Patan', 'Porbandar', 'Rajkot', 'Sabarkantha', 'Surat', 'Surendranagar', 'Tapi', 'Vadodara', 'Valsad', 'Vav-Tharad'],
+    'Haryana': ['Ambala', 'Bhiwani', 'Charkhi Dadri', 'Faridabad', 'Fatehabad', 'Gurugram', 'Hisar', 'Jhajjar', 'Jind', 'Kaithal', 'Karnal', 'Kurukshetra', 'Mahendragarh', 'Nuh', 'Palwal', 'Panchkula', 'Panipat', 'Rewari', 'Rohtak', 'Sirsa', 'Sonipat', 'Yamunanagar'],
+    'Dadra and Nagar Haveli and Daman and Diu': ['Dadra and Nagar Haveli District', 'Daman District', 'Diu District']
+}
+SAMPLE_SUB_DISTRICTS = {
+    'Maharashtra': {
+        'Mumbai': ['Mumbai Suburban', 'Mumbai City']
+    },
+    'Karnataka': {
+        'Bangalore': ['Bangalore Urban', 'Bangalore Rural']
+    }
+}
+SAMPLE_VILLAGES = {
+    'Maharashtra': {
+        'Mumbai': {
+            'Mumbai Suburban': ['Andheri', 'Bandra', 'Juhu']
+        }
+    }
+}
+SAMPLE_PIN_CODES = ('400058', '400050', '400049', '411001', '411045')
+
+class LocationViewSet(QueryBudgetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = IndiaLocation.objects.all()
     serializer_class = IndiaLocationSerializer
+    query_budgets = {
+        'states': 2,
+        'districts': 2,
+        'sub_districts': 2,
+        'villages': 2,
+        'pin_codes': 2,
+        'search': 2,
+        'reverse_geocode': 2,
+    }
+    search_max_results = 25
+
+    def get_hierarchy_etag(self, request, *args, **kwargs):
+        # Any gazetteer change bumps the location version
+        return make_etag(request, self.action, get_version(LOCATION_VERSION_KEY), request.get_full_path())
+
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def snapshot(self, request):
+        """
+        Where to download the published hierarchy: the whole country, or one
+        state with `?state=`. Written by `manage.py publish_gazetteer`.
+        """
+        manifest = gazetteer.load_manifest()
+        if manifest is None:
+            return Response({'message': 'No gazetteer snapshot has been published'}, status=status.HTTP_404_NOT_FOUND)
+
+        state = request.query_params.get('state')
+        entry = manifest['states'].get(state) if state else manifest['all']
+        if entry is None:
+            return Response({'message': f'No snapshot for state: {state}'}, status=status.HTTP_404_NOT_FOUND)
+
+        url = request.build_absolute_uri(reverse('location-snapshot-file', args=[entry['name']]))
+        response = Response({'url': url, 'hash': entry['hash'], 'size': entry['size']})
+        # Short-lived, so a re-publish reaches clients within minutes
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+    def snapshot_file(self, request, name):
+        """A content-hashed snapshot, sent as stored (gzip) whenever the client accepts it"""
+        compressed = gazetteer.open_snapshot(name)
+        if compressed is None:
+            return Response({'message': 'Snapshot not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(compressed, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(compressed), content_type='application/json')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        # The name changes with the content, so it can be cached forever
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+        return response
     
     @action(detail=False, methods=['get'])
     def test(self, request):
@@ -550,69 +1244,103 @@ class LocationViewSet(viewsets.ReadOnlyModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Typeahead over the gazetteer. Digits match pin code prefixes, text is
+        matched fuzzily against village, sub-district and district names via
+        the trigram indexes. Returns ranked rows with the full hierarchy.
+        """
+        term = request.query_params.get('q', '').strip()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), self.search_max_results))
+        except ValueError:
+            limit = 10
+
+        fields = ['id', 'state', 'district', 'sub_district', 'village', 'pin_code']
+        if term.isdigit() and len(term) >= 2:
+            results = IndiaLocation.objects.filter(pin_code__startswith=term) \
+                .order_by('pin_code', 'village').values(*fields)[:limit]
+            return Response({'results': list(results)})
+        if len(term) < 3:
+            # Trigram indexes cannot help below three characters
+            return Response({'results': []})
+
+        locations = IndiaLocation.objects.filter(
+            Q(village__trigram_word_similar=term)
+            | Q(sub_district__trigram_word_similar=term)
+            | Q(district__trigram_word_similar=term)
+        )
+        state = request.query_params.get('state')
+        if state:
+            locations = locations.filter(state=state)
+
+        results = locations.annotate(
+            is_prefix=Case(
+                When(village__istartswith=term, then=Value(1)),
+                default=Value(0), output_field=IntegerField()
+            ),
+            similarity=Greatest(
+                TrigramWordSimilarity(term, 'village'),
+                TrigramWordSimilarity(term, 'sub_district'),
+                TrigramWordSimilarity(term, 'district'),
+            ),
+        ).order_by('-is_prefix', '-similarity', 'village').values(*fields, 'similarity')[:limit]
+        return Response({'results': list(results)})
+
+    @action(detail=False, methods=['get'])
+    def reverse_geocode(self, request):
+        """The known location nearest to `latitude`/`longitude`, for auto-filling the property form"""
+        try:
+            latitude = float(request.query_params['latitude'])
+            longitude = float(request.query_params['longitude'])
+            max_distance = float(request.query_params.get('max_distance', REVERSE_GEOCODE_MAX_KM))
+        except (KeyError, ValueError):
+            return Response(
+                {'message': 'latitude and longitude are required numbers'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({'message': 'Coordinates out of range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        location = IndiaLocation.objects.nearest(latitude, longitude)
+        if location is None or location.distance.km > max_distance:
+            return Response(
+                {'message': f'No known location within {max_distance} km'}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(dict(IndiaLocationSerializer(location).data, distance_m=round(location.distance.m)))
+
+    @action(detail=False, methods=['get'])
+    @conditional_view('get_hierarchy_etag')
     def states(self, request):
         try:
-            states = IndiaLocation.objects.values_list('state', flat=True).distinct().order_by('state')
-            if not states.exists():
+            states = location_index.children()
+            if not states:
                 # Return sample states if no data exists
-                sample_states = ['Maharashtra', 'Karnataka', 'Tamil Nadu', 'Delhi', 'Gujarat']
-                return Response({'states': sample_states})
+                return Response({'states': list(SAMPLE_STATES)})
             return Response({'states': list(states)})
         except Exception as e:
             # Fallback to sample data
-            sample_states = ['Maharashtra', 'Karnataka', 'Tamil Nadu', 'Delhi', 'Gujarat']
-            return Response({'states': sample_states})
+            return Response({'states': list(SAMPLE_STATES)})
     
     @action(detail=False, methods=['get'])
+    @conditional_view('get_hierarchy_etag')
     def districts(self, request):
         try:
             state = request.query_params.get('state')
             if not state:
                 return Response({'districts': []}, status=400)
             
-            districts = IndiaLocation.objects.filter(state=state) \
-                .values_list('district', flat=True).distinct().order_by('district')
+            districts = location_index.children(state)
             
-            if not districts.exists():
+            if not districts:
                 # Return sample districts for the state
-                sample_districts = {
-                    'Maharashtra': ['Ahmednagar', 'Akola', 'Amravati', 'Aurangabad', 'Beed', 'Bhandara', 'Buldhana', 'Chandrapur', 'Dhule', 'Gadchiroli', 'Gondia', 'Hingoli', 'Jalgaon', 'Jalna', 'Kolhapur', 'Latur', 'Mumbai City', 'Mumbai Suburban', 'Nagpur', 'Nanded', 'Nandurbar', 'Nashik', 'Osmanabad', 'Palghar', 'Parbhani', 'Pune', 'Raigad', 'Ratnagiri', 'Sangli', 'Satara', 'Sindhudurg', 'Solapur', 'Thane', 'Wardha', 'Washim', 'Yavatmal'],
-                    'Karnataka': ['Bagalkot', 'Ballari', 'Belagavi', 'Bengaluru Rural', 'Bengaluru Urban', 'Bidar', 'Chamarajanagar', 'Chikballapur', 'Chikkamagaluru', 'Chitradurga', 'Dakshina Kannada', 'Davanagere', 'Dharwad', 'Gadag', 'Hassan', 'Haveri', 'Kalaburagi', 'Kodagu', 'Kolar', 'Koppal', 'Mandya', 'Mysuru', 'Raichur', 'Ramanagara', 'Shivamogga', 'Tumakuru', 'Udupi', 'Uttara Kannada', 'Vijayapura', 'Vijayanagara', 'Yadgir'],
-                    'Tamil Nadu': ['Ariyalur', 'Chengalpattu', 'Chennai', 'Coimbatore', 'Cuddalore', 'Dharmapuri', 'Dindigul', 'Erode', 'Kallakurichi', 'Kancheepuram', 'Karur', 'Krishnagiri', 'Madurai', 'Mayiladuthurai', 'Nagapattinam', 'Namakkal', 'Nilgiris', 'Perambalur', 'Pudukkottai', 'Ramanathapuram', 'Ranipet', 'Salem', 'Sivaganga', 'Tenkasi', 'Thanjavur', 'Theni', 'Thoothukudi', 'Tiruchirappalli', 'Tirunelveli', 'Tirupathur', 'Tiruppur', 'Tiruvallur', 'Tiruvannamalai', 'Tiruvarur', 'Vellore', 'Viluppuram', 'Virudhunagar'],
-                    'Uttar Pradesh': ['Agra', 'Aligarh', 'Allahabad', 'Ambedkar Nagar', 'Amethi', 'Amroha', 'Auraiya', 'Ayodhya', 'Azamgarh', 'Baghpat', 'Bahraich', 'Ballia', 'Balrampur', 'Banda', 'Barabanki', 'Bareilly', 'Basti', 'Bhadohi', 'Bijnor', 'Budaun', 'Bulandshahr', 'Chandauli', 'Chitrakoot', 'Deoria', 'Etah', 'Etawah', 'Farrukhabad', 'Fatehpur', 'Firozabad', 'Gautam Buddha Nagar', 'Ghaziabad', 'Ghazipur', 'Gonda', 'Gorakhpur', 'Hamirpur', 'Hapur', 'Hardoi', 'Hathras', 'Jalaun', 'Jaunpur', 'Jhansi', 'Kannauj', 'Kanpur Dehat', 'Kanpur Nagar', 'Kasganj', 'Kaushambi', 'Kheri', 'Kushinagar', 'Lalitpur', 'Lucknow', 'Maharajganj', 'Mahoba', 'Mainpuri', 'Mathura', 'Mau', 'Meerut', 'Mirzapur', 'Moradabad', 'Muzaffarnagar', 'Pilibhit', 'Pratapgarh', 'Prayagraj', 'Raebareli', 'Rampur', 'Saharanpur', 'Sambhal', 'Sant Kabir Nagar', 'Shahjahanpur', 'Shamli', 'Shravasti', 'Siddharthnagar', 'Sitapur', 'Sonbhadra', 'Sultanpur', 'Unnao', 'Varanasi'],
-                    'Rajasthan': ['Ajmer','Alwar','Anupgarh','Balotra','Banswara','Baran','Barmer','Beawar','Bharatpur','Bhilwara','Bikaner','Bundi','Chittorgarh','Churu','Dausa','Deeg','Didwana-Kuchaman','Dholpur','Dudu','Dungarpur','Gangapur City','Hanumangarh','Jaipur','Jaipur Rural','Jaisalmer','Jalore','Jhalawar','Jhunjhunu','Jodhpur','Jodhpur Rural','Karauli','Kekri','Khairthal-Tijara','Kota','Kotputli-Behror','Nagaur','Neem Ka Thana','Pali','Phalodi','Pratapgarh','Rajsamand','Salumbar','Sanchore','Sawai Madhopur','Shahpura','Sikar','Sirohi','Sri Ganganagar','Tonk','Udaipur'],
-                    'Madhya Pradesh': ['Agar Malwa', 'Alirajpur', 'Anuppur', 'Ashoknagar', 'Balaghat', 'Barwani', 'Betul', 'Bhind', 'Bhopal', 'Burhanpur', 'Chhatarpur', 'Chhindwara', 'Damoh', 'Datia', 'Dewas', 'Dhar', 'Dindori', 'Guna', 'Gwalior', 'Harda', 'Hoshangabad', 'Indore', 'Jabalpur', 'Jhabua', 'Katni', 'Khandwa', 'Khargone', 'Mandla', 'Mandsaur', 'Morena', 'Narsinghpur', 'Neemuch', 'Panna', 'Raisen', 'Rajgarh', 'Ratlam', 'Rewa', 'Sagar', 'Satna', 'Sehore', 'Seoni', 'Shahdol', 'Shajapur', 'Sheopur', 'Shivpuri', 'Sidhi', 'Singrauli', 'Tikamgarh', 'Ujjain', 'Umaria', 'Vidisha'],
-                    'Himachal Pradesh': ['Bilaspur', 'Chamba', 'Hamirpur', 'Kangra', 'Kinnaur', 'Kullu', 'Lahaul and Spiti', 'Mandi', 'Shimla', 'Solan', 'Sirmour', 'Una'],
-                    'Jammu and Kashmir': ['Anantnag', 'Bandipora', 'Baramulla', 'Budgam', 'Doda', 'Ganderbal', 'Jammu', 'Kathua', 'Kishtwar', 'Kulgam', 'Kupwara', 'Poonch', 'Pulwama', 'Rajouri', 'Ramban', 'Reasi', 'Samba', 'Shopian', 'Srinagar', 'Udhampur'],
-                    'Ladakh': ['Changthang', 'Drass', 'Kargil', 'Leh', 'Nubra', 'Sham', 'Zanskar'],
-                    'Jharkhand': ['Bokaro', 'Chatra', 'Deoghar', 'Dhanbad', 'Dumka', 'East Singhbhum', 'Garhwa', 'Giridih', 'Godda', 'Gumla', 'Hazaribagh', 'Jamtara', 'Khunti', 'Koderma', 'Latehar', 'Lohardaga', 'Pakur', 'Palamu', 'Ramgarh', 'Ranchi', 'Sahebganj', 'Saraikela Kharsawan', 'Simdega', 'West Singhbhum'],
-                    'Kerala': ['Alappuzha', 'Ernakulam', 'Idukki', 'Kannur', 'Kasaragod', 'Kollam', 'Kottayam', 'Kozhikode', 'Malappuram', 'Palakkad', 'Pathanamthitta', 'Thrissur', 'Thiruvananthapuram', 'Wayanad'],
-                    'Meghalaya': ['East Garo Hills', 'East Jaintia Hills', 'East Khasi Hills', 'Eastern West Khasi Hills', 'North Garo Hills', 'Ri-Bhoi', 'South Garo Hills', 'South West Garo Hills', 'South West Khasi Hills', 'West Garo Hills', 'West Jaintia Hills', 'West Khasi Hills'],
-                    'Mizoram': ['Aizawl', 'Champhai', 'Hnahthial', 'Khawzawl', 'Kolasib', 'Lawngtlai', 'Lunglei', 'Mamit', 'Saiha', 'Serchhip', 'Saitual'],
-                    'Nagaland': ['Chümoukedima', 'Dimapur', 'Kiphire', 'Kohima', 'Longleng', 'Meluri', 'Mokokchung', 'Mon', 'Niuland', 'Noklak', 'Peren', 'Phek', 'Shamator', 'Tuensang', 'Tseminyü', 'Wokha', 'Zünheboto'],
-                    'Odisha': ['Angul','Balangir','Balasore','Bargarh','Bhadrak','Boudh','Cuttack','Deogarh','Dhenkanal','Gajapati','Ganjam','Jagatsinghpur','Jajpur','Jharsuguda','Kalahandi','Kandhamal','Kendrapara','Kendujhar (Keonjhar)','Khordha','Koraput','Malkangiri','Mayurbhanj','Nabarangpur','Nayagarh','Nuapada','Puri','Rayagada','Sambalpur','Subarnapur (Sonepur)','Sundargarh'],
-                    'Puducherry': ['Puducherry', 'Karaikal', 'Mahe', 'Yanam'],
-                    'Punjab': ['Amritsar','Barnala','Bathinda','Faridkot','Fatehgarh Sahib','Fazilka','Ferozepur','Gurdaspur','Hoshiarpur','Jalandhar','Kapurthala','Ludhiana','Malerkotla','Mansa','Moga','Pathankot','Patiala','Rupnagar','Sahibzada Ajit Singh Nagar (Mohali)','Sangrur','Shahid Bhagat Singh Nagar (Nawanshahr)','Sri Muktsar Sahib','Tarn Taran'],
-                    'Sikkim': ['Gangtok', 'Mangan', 'Namchi', 'Gyalshing', 'Pakyong', 'Soreng'],
-                    'Tripura': ['Dhalai','Gomati','Khowai','North Tripura','Sipahijala','South Tripura','Unakoti','West Tripura'],
-                    'Uttarakhand': ['Almora','Bageshwar','Chamoli','Champawat','Dehradun','Haridwar','Nainital','Pauri Garhwal','Pithoragarh','Rudraprayag','Tehri Garhwal','Udham Singh Nagar','Uttarkashi'],
-                    'West Bengal': ['Alipurduar','Bankura','Birbhum','Cooch Behar','Dakshin Dinajpur (South Dinajpur)','Darjeeling','Hooghly','Howrah','Jalpaiguri','Jhargram','Kalimpong','Kolkata','Malda','Murshidabad','Nadia','North 24 Parganas','Paschim Bardhaman (West Bardhaman)','Paschim Medinipur (West Medinipur)','Purba Bardhaman (East Bardhaman)','Purba Medinipur (East Medinipur)','Purulia','South 24 Parganas','Uttar Dinajpur (North Dinajpur)'],
-                    'Telangana': ['Adilabad','Bhadradri Kothagudem','Hanumakonda','Hyderabad','Jagtial','Jangaon','Jayashankar Bhupalpally','Jogulamba Gadwal','Kamareddy','Karimnagar','Khammam','Kumuram Bheem Asifabad','Mahabubabad','Mahabubnagar','Mancherial','Medak','Medchal–Malkajgiri','Mulugu','Nagarkurnool','Nalgonda','Narayanpet','Nirmal','Nizamabad','Peddapalli','Rajanna Sircilla','Rangareddy','Sangareddy','Siddipet','Suryapet','Vikarabad','Wanaparthy','Warangal','Yadadri Bhuvanagiri'],
-                    'Manipur': ['Bishnupur', 'Chandel', 'Churachandpur', 'Imphal East', 'Imphal West', 'Jiribam', 'Kakching', 'Kamjong', 'Kangpokpi', 'Noney', 'Pherzawl', 'Senapati', 'Tamenglong', 'Tengnoupal', 'Thoubal', 'Ukhrul'],
-                    'Lakshadweep': ['Lakshadweep'],
-                    'Delhi': ['Central Delhi', 'East Delhi', 'New Delhi', 'North Delhi', 'North East Delhi', 'North West Delhi', 'Shahdara', 'South Delhi', 'South East Delhi', 'South West Delhi', 'West Delhi'],
-                    'Goa': ['North Goa', 'South Goa'],
-                    'Gujarat': ['Ahmedabad', 'Amreli', 'Anand', 'Aravalli', 'Banaskantha', 'Bharuch', 'Bhavnagar', 'Botad', 'Chhota Udaipur', 'Dahod', 'Dang', 'Devbhoomi Dwarka', 'Gandhinagar', 'Gir Somnath', 'Jamnagar', 'Junagadh', 'Kheda', 'Kutch', 'Mahisagar', 'Mehsana', 'Morbi', 'Narmada', 'Navsari', 'Panchmahal', 'Patan', 'Porbandar', 'Rajkot', 'Sabarkantha', 'Surat', 'Surendranagar', 'Tapi', 'Vadodara', 'Valsad', 'Vav-Tharad'],
-                    'Haryana': ['Ambala', 'Bhiwani', 'Charkhi Dadri', 'Faridabad', 'Fatehabad', 'Gurugram', 'Hisar', 'Jhajjar', 'Jind', 'Kaithal', 'Karnal', 'Kurukshetra', 'Mahendragarh', 'Nuh', 'Palwal', 'Panchkula', 'Panipat', 'Rewari', 'Rohtak', 'Sirsa', 'Sonipat', 'Yamunanagar'],
-                    'Dadra and Nagar Haveli and Daman and Diu': ['Dadra and Nagar Haveli District', 'Daman District', 'Diu District']
-                }
-                return Response({'districts': sample_districts.get(state, [])})
+                return Response({'districts': SAMPLE_DISTRICTS.get(state, [])})
             
             return Response({'districts': list(districts)})
         except Exception as e:
             return Response({'districts': []})
     
     @action(detail=False, methods=['get'])
+    @conditional_view('get_hierarchy_etag')
     def sub_districts(self, request):
         try:
             state = request.query_params.get('state')
@@ -621,28 +1349,18 @@ class LocationViewSet(viewsets.ReadOnlyModelViewSet):
             if not state or not district:
                 return Response({'sub_districts': []}, status=400)
             
-            sub_districts = IndiaLocation.objects.filter(
-                state=state, 
-                district=district
-            ).values_list('sub_district', flat=True).distinct().order_by('sub_district')
+            sub_districts = location_index.children(state, district)
             
-            if not sub_districts.exists():
+            if not sub_districts:
                 # Return sample sub-districts
-                sample_sub_districts = {
-                    'Maharashtra': {
-                        'Mumbai': ['Mumbai Suburban', 'Mumbai City']
-                    },
-                    'Karnataka': {
-                        'Bangalore': ['Bangalore Urban', 'Bangalore Rural']
-                    }
-                }
-                return Response({'sub_districts': sample_sub_districts.get(state, {}).get(district, [])})
+                return Response({'sub_districts': SAMPLE_SUB_DISTRICTS.get(state, {}).get(district, [])})
             
             return Response({'sub_districts': list(sub_districts)})
         except Exception as e:
             return Response({'sub_districts': []})
     
     @action(detail=False, methods=['get'])
+    @conditional_view('get_hierarchy_etag')
     def villages(self, request):
         try:
             state = request.query_params.get('state')
@@ -652,58 +1370,50 @@ class LocationViewSet(viewsets.ReadOnlyModelViewSet):
             if not all([state, district, sub_district]):
                 return Response({'villages': []}, status=400)
             
-            villages = IndiaLocation.objects.filter(
-                state=state,
-                district=district,
-                sub_district=sub_district
-            ).values_list('village', flat=True).distinct().order_by('village')
+            villages = location_index.children(state, district, sub_district)
             
-            if not villages.exists():
+            if not villages:
                 # Return sample villages
-                sample_villages = {
-                    'Maharashtra': {
-                        'Mumbai': {
-                            'Mumbai Suburban': ['Andheri', 'Bandra', 'Juhu']
-                        }
-                    }
-                }
-                return Response({'villages': sample_villages.get(state, {}).get(district, {}).get(sub_district, [])})
+                return Response({'villages': SAMPLE_VILLAGES.get(state, {}).get(district, {}).get(sub_district, [])})
             
             return Response({'villages': list(villages)})
         except Exception as e:
             return Response({'villages': []})
     
     @action(detail=False, methods=['get'])
+    @conditional_view('get_hierarchy_etag')
     def pin_codes(self, request):
         try:
-            state = request.query_params.get('state')
-            district = request.query_params.get('district')
-            sub_district = request.query_params.get('sub_district')
-            village = request.query_params.get('village')
+            pin_codes = location_index.pin_codes(
+                state=request.query_params.get('state'),
+                district=request.query_params.get('district'),
+                sub_district=request.query_params.get('sub_district'),
+                village=request.query_params.get('village'),
+            )
             
-            query = IndiaLocation.objects.all()
-            if state: query = query.filter(state=state)
-            if district: query = query.filter(district=district)
-            if sub_district: query = query.filter(sub_district=sub_district)
-            if village: query = query.filter(village=village)
-            
-            pin_codes = query.values_list('pin_code', flat=True).distinct().order_by('pin_code')
-            
-            if not pin_codes.exists():
+            if not pin_codes:
                 # Return sample pin codes
-                sample_pin_codes = ['400058', '400050', '400049', '411001', '411045']
-                return Response({'pin_codes': sample_pin_codes})
+                return Response({'pin_codes': list(SAMPLE_PIN_CODES)})
             
             return Response({'pin_codes': list(pin_codes)})
         except Exception as e:
             return Response({'pin_codes': []})
 
-class ShortlistViewSet(viewsets.ModelViewSet):
+class ShortlistViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     serializer_class = ShortlistSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 4,
+        'retrieve': 4,
+    }
 
     def get_queryset(self):
-        return Shortlist.objects.filter(buyer=self.request.user)
+        return Shortlist.objects.filter(buyer=self.request.user).with_property_details()
     
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(buyer=self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()